@@ -0,0 +1,361 @@
+"""Headless benchmarks for the editor and exporter hot paths
+
+Runs GameEditor against a hidden Tk root with SDL's dummy video driver,
+builds synthetic scenes of increasing size and times the preview pass,
+canvas picking, the object list rebuild, background image decoding,
+every export mode, the exported game's own frame loop, a large tile
+layer and the editor's cold start. Results are written as JSON so runs can be compared
+across commits:
+
+    python benchmark.py --output before.json
+    python benchmark.py --output after.json --compare before.json
+
+Tk still needs an X display on Linux; without one the script re-runs
+itself under xvfb-run when that is installed.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+SIZES = (10, 100, 1000, 10000)
+
+
+def ensure_display():
+    """Re-exec under a virtual X server when there is no display to use"""
+    if not sys.platform.startswith('linux') or os.environ.get('DISPLAY'):
+        return
+    if os.environ.get('BENCHMARK_UNDER_XVFB'):
+        sys.exit("No X display available, even under xvfb-run")
+    xvfb_run = shutil.which('xvfb-run')
+    if xvfb_run is None:
+        sys.exit("No X display available; run under xvfb-run or set DISPLAY")
+    os.environ['BENCHMARK_UNDER_XVFB'] = '1'
+    os.execv(xvfb_run, [xvfb_run, '-a', sys.executable] + sys.argv)
+
+
+def timed(func, repeat=5):
+    """Return the median wall time of func() in seconds"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def make_images(pygame, directory, count, size=64):
+    """Write count distinct PNGs and return their paths"""
+    rng = random.Random(count)
+    paths = []
+    for i in range(count):
+        surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        surface.fill((rng.randrange(256), rng.randrange(256), rng.randrange(256), 255))
+        pygame.draw.circle(surface, (0, 0, 0, 128), (size // 2, size // 2), size // 3)
+        path = os.path.join(directory, f"sprite{i}.png")
+        pygame.image.save(surface, path)
+        paths.append(path)
+    return paths
+
+
+def check_pixel_bridge(editor_module, pygame, directory):
+    """Check that scaled sprites reach Tk with the same pixels as tostring
+
+    Timings are meaningless if the fast path draws the wrong colours.
+    """
+    rng = random.Random(3)
+    source = pygame.Surface((37, 23), pygame.SRCALPHA)
+    for x in range(37):
+        for y in range(23):
+            source.set_at((x, y), (rng.randrange(256), rng.randrange(256), rng.randrange(256),
+                                   rng.randrange(1, 256)))
+    path = os.path.join(directory, 'bridge-check.png')
+    pygame.image.save(source, path)
+    loaded = pygame.image.load(path)
+    bridge = editor_module.PixelBridge()
+    for opaque, mode in ((False, 'RGBA'), (True, 'RGB')):
+        for size in ((20, 3), (50, 50), (37, 23)):
+            staging = bridge.to_image(loaded, *size, opaque=opaque)
+            expected = pygame.image.tostring(pygame.transform.scale(loaded, size), mode)
+            if staging.tobytes() != expected:
+                sys.exit(f"PixelBridge decoded a {size[0]}x{size[1]} {mode} sprite incorrectly")
+
+
+def populate(editor_module, editor, images, count, seed=0):
+    """Fill the editor with count objects scattered over a large level"""
+    rng = random.Random(seed)
+    extent = max(600, int((count * 2500) ** 0.5))
+    for i in range(count):
+        path = images[i % len(images)]
+        asset_id = editor.assets.acquire(path)
+        size = rng.choice((16, 32, 48, 64))
+        obj = editor_module.SceneObject(rng.randrange(extent), rng.randrange(extent),
+                                        size, size, asset_id, path)
+        editor.add_object(obj)
+    editor.update_object_list()
+
+
+def pump(root, until, timeout=60.0):
+    """Run the Tk loop until until() is true"""
+    deadline = time.perf_counter() + timeout
+    while not until():
+        root.update()
+        if time.perf_counter() > deadline:
+            raise RuntimeError("Timed out waiting for the Tk loop")
+        time.sleep(0.001)
+
+
+def bench_scene(editor_module, root, images, count, workdir):
+    editor = editor_module.GameEditor(root)
+    populate(editor_module, editor, images, count)
+    results = {}
+
+    def cold_preview():
+        editor.reset_preview()
+        editor.update_preview()
+    results['update_preview_cold'] = timed(cold_preview)
+
+    moving = editor.objects[len(editor.objects) // 2]
+
+    def move_one():
+        moving.x += 1
+        editor.spatial.update(moving)
+        editor.mark_dirty(moving)
+        editor.update_preview()
+    results['update_preview_move_one'] = timed(move_one, repeat=20)
+    results['update_preview_idle'] = timed(editor.update_preview, repeat=20)
+
+    def resize_one():
+        # Live resize: a new size every frame, so every frame is a cache miss
+        moving.width += 1
+        editor.spatial.update(moving)
+        editor.mark_dirty(moving)
+        editor.update_preview()
+    results['update_preview_resize_one'] = timed(resize_one, repeat=20)
+
+    rng = random.Random(1)
+    left, top, right, bottom = editor.visible_bounds()
+    clicks = [types.SimpleNamespace(x=rng.randrange(right - left), y=rng.randrange(bottom - top), state=0)
+              for _ in range(100)]
+
+    def click_all():
+        for event in clicks:
+            editor.on_canvas_click(event)
+    results['on_canvas_click'] = timed(click_all) / len(clicks)
+
+    results['update_object_list'] = timed(editor.update_object_list)
+
+    # Batch edits over the whole scene, including the redraw they trigger
+    editor.set_selection(editor.objects)
+
+    def move_all():
+        editor.arrange_selection(editor_module.move_boxes, 1, 0)
+        editor.update_preview()
+    results['move_selection_all'] = timed(move_all)
+    results['distribute_selection_all'] = timed(
+        lambda: editor.arrange_selection(editor_module.distribute_boxes, 'x'))
+    editor.set_selection(())
+
+    for name, atlas, data in (('export_script', False, False),
+                              ('export_data', False, True),
+                              ('export_atlas_data', True, True)):
+        out_dir = os.path.join(workdir, f"{name}_{count}")
+        os.makedirs(out_dir, exist_ok=True)
+        editor.export_atlas.set(atlas)
+        editor.export_data.set(data)
+        results[name] = timed(lambda: editor.write_python_export(os.path.join(out_dir, 'game.py')),
+                              repeat=3)
+
+    # Re-export after one source image changed on disk
+    out_path = os.path.join(workdir, f"export_data_{count}", 'game.py')
+    editor.export_atlas.set(False)
+    editor.export_data.set(True)
+    editor.write_python_export(out_path)
+
+    def export_after_change():
+        os.utime(images[0])
+        editor.write_python_export(out_path)
+    results['export_data_one_changed'] = timed(export_after_change, repeat=3)
+    results.update(bench_exported_game(out_path))
+
+    editor.scheduler.cancel()
+    for child in root.winfo_children():
+        child.destroy()
+    return results
+
+
+def bench_exported_game(game_path, frames=300):
+    """Run an exported game's own --benchmark mode and collect its timings"""
+    report_path = game_path + '.bench.json'
+    subprocess.run([sys.executable, os.path.basename(game_path), '--benchmark', str(frames),
+                    '--redraw-all', '--output', report_path],
+                   cwd=os.path.dirname(game_path), check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    with open(report_path) as f:
+        report = json.load(f)
+    return {
+        'game_load': report['load_ms'] / 1000,
+        'game_frame_mean': report['mean_ms'] / 1000,
+        'game_frame_p99': report['p99_ms'] / 1000,
+    }
+
+
+def bench_tiles(editor_module, pygame, root, workdir, size=1000):
+    """Time drawing and editing a size x size tile layer"""
+    editor = editor_module.GameEditor(root)
+    tileset = pygame.Surface((256, 256))
+    for i in range(64):
+        tileset.fill(((i * 37) % 256, (i * 91) % 256, (i * 53) % 256), ((i % 8) * 32, (i // 8) * 32, 32, 32))
+    tileset_path = os.path.join(workdir, 'tileset.png')
+    pygame.image.save(tileset, tileset_path)
+
+    rng = random.Random(2)
+    tilemap = editor_module.TileMap(editor.assets.acquire(tileset_path), tileset_path, 32, size, size)
+    for i in range(len(tilemap.tiles)):
+        tilemap.tiles[i] = rng.randrange(64)
+    editor.set_tilemap(tilemap)
+    results = {}
+
+    def cold():
+        editor.reset_preview()
+        editor.update_preview()
+    results['tiles_preview_cold'] = timed(cold)
+
+    def paint_one():
+        tilemap.set(3, 3, (tilemap.get(3, 3) + 1) % 64)
+        editor.update_preview()
+    results['tiles_paint_one'] = timed(paint_one, repeat=20)
+    results['tiles_preview_idle'] = timed(editor.update_preview, repeat=20)
+
+    editor.scheduler.cancel()
+    for child in root.winfo_children():
+        child.destroy()
+    return results
+
+
+def bench_import(editor_module, root, images):
+    """Time decoding a batch of distinct files through the import pool"""
+    editor = editor_module.GameEditor(root)
+    start = time.perf_counter()
+    editor.import_files(images)
+    pump(root, lambda: not editor.importing)
+    elapsed = time.perf_counter() - start
+    editor.scheduler.cancel()
+    for child in root.winfo_children():
+        child.destroy()
+    return elapsed
+
+
+def bench_startup(repeat=3):
+    """Median time from interpreter start to the first idle editor window"""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          'grok_deepseek_claude_chatgpto1pro.py')
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, script, '--measure-startup'],
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, baseline, threshold):
+    """Print per-metric ratios against a baseline; return the regressions"""
+    regressions = []
+    for scene, metrics in current['results'].items():
+        for metric, value in metrics.items():
+            old = baseline.get('results', {}).get(scene, {}).get(metric)
+            if not old:
+                continue
+            ratio = value / old
+            flag = ''
+            if ratio > threshold:
+                flag = '  REGRESSION'
+                regressions.append((scene, metric, ratio))
+            print(f"{scene:>12} {metric:<26} {old * 1000:10.3f} ms -> {value * 1000:10.3f} ms  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES),
+                        help="object counts to benchmark")
+    parser.add_argument('--images', type=int, default=20,
+                        help="distinct images shared by the synthetic scenes")
+    parser.add_argument('--output', default='bench_results.json',
+                        help="where to write the JSON results")
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help="earlier results file to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="slowdown ratio counted as a regression")
+    args = parser.parse_args()
+
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    ensure_display()
+
+    import tkinter as tk
+    import pygame
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import grok_deepseek_claude_chatgpto1pro as editor_module
+
+    root = tk.Tk()
+    root.withdraw()
+    workdir = tempfile.mkdtemp(prefix='editor-bench-')
+    try:
+        check_pixel_bridge(editor_module, pygame, workdir)
+        images = make_images(pygame, workdir, args.images)
+        results = {}
+        for count in args.sizes:
+            results[f"n={count}"] = bench_scene(editor_module, root, images, count, workdir)
+            print(f"n={count}: done", file=sys.stderr)
+
+        import_images = make_images(pygame, tempfile.mkdtemp(dir=workdir), 50, size=256)
+        results['import'] = {'import_decode_50x256px': bench_import(editor_module, root, import_images)}
+        results['tiles 1000x1000'] = bench_tiles(editor_module, pygame, root, workdir)
+        results['startup'] = {'startup_to_idle': bench_startup()}
+    finally:
+        root.destroy()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'unit': 'seconds',
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,23 +1,1666 @@
+import time
+_STARTED = time.perf_counter()  # for the cold-start measurement
+
 import os
 import tkinter as tk
-from tkinter import filedialog, ttk, messagebox
-import pygame
-import subprocess
+from tkinter import filedialog, ttk, messagebox, simpledialog
+import importlib.util
 import sys
 import platform
+import shutil
+import hashlib
+import math
+import queue
+import json
+import io
+import base64
+import mmap
+import struct
+from array import array
+from collections import OrderedDict, deque
+from contextlib import contextmanager, nullcontext
+
+
+def lazy_import(name):
+    """Return a module that is only executed on first attribute access
+
+    Returns None if the module isn't installed.
+    """
+    try:
+        spec = importlib.util.find_spec(name)
+    except ModuleNotFoundError:
+        spec = None
+    if spec is None:
+        return None
+    if name in sys.modules:
+        return sys.modules[name]
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+# Heavy dependencies load the first time an image is decoded or converted,
+# not while the window is coming up
+pygame = lazy_import('pygame')
+Image = lazy_import('PIL.Image')
+ImageTk = lazy_import('PIL.ImageTk')
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+IMAGE_FILETYPES = [("Image Files", "*.png *.jpg *.jpeg *.bmp")]
+
+
+def file_mtime(path):
+    """Return a file's modification time, or None if it can't be read"""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def write_if_changed(path, text):
+    """Write text to path unless the file already holds exactly that
+
+    Leaves unchanged files (and their modification times) alone; returns
+    True if the file was written.
+    """
+    data = text.encode('utf-8')
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+
+def pack_atlas(sizes, max_size=2048, padding=1):
+    """Shelf-pack rectangles onto as few max_size x max_size pages as possible
+
+    Returns (placements, pages): placements[i] is (page, x, y) for sizes[i]
+    and pages[j] is the (width, height) actually used on page j. Rectangles
+    larger than a page get a page of their own.
+    """
+    # Tallest first keeps shelves tight
+    order = sorted(range(len(sizes)), key=lambda i: (sizes[i][1], sizes[i][0]), reverse=True)
+    placements = [None] * len(sizes)
+    pages = []  # {'width', 'height', 'shelves': [[y, height, next_x], ...]}
+    
+    for i in order:
+        w, h = sizes[i]
+        pw, ph = w + padding, h + padding
+        if pw > max_size or ph > max_size:
+            pages.append({'width': w, 'height': h, 'shelves': None})
+            placements[i] = (len(pages) - 1, 0, 0)
+            continue
+        
+        for page_index, page in enumerate(pages):
+            if page['shelves'] is None:
+                continue
+            shelf = next((shelf for shelf in page['shelves']
+                          if ph <= shelf[1] and shelf[2] + pw <= max_size), None)
+            if shelf is None and page['height'] + ph <= max_size:
+                shelf = [page['height'], ph, 0]
+                page['shelves'].append(shelf)
+                page['height'] += ph
+            if shelf is not None:
+                break
+        else:
+            page = {'width': 0, 'height': ph, 'shelves': [[0, ph, 0]]}
+            pages.append(page)
+            page_index = len(pages) - 1
+            shelf = page['shelves'][0]
+        
+        placements[i] = (page_index, shelf[2], shelf[0])
+        shelf[2] += pw
+        page['width'] = max(page['width'], shelf[2])
+    
+    return placements, [(page['width'], page['height']) for page in pages]
+
+
+def index_runs(indices):
+    """Group sorted ints into (first, last) runs of consecutive values"""
+    runs = []
+    for i in indices:
+        if runs and runs[-1][1] == i - 1:
+            runs[-1][1] = i
+        else:
+            runs.append([i, i])
+    return runs
+
+
+# Bulk arrange operations. Each takes a list of (x, y, width, height) boxes
+# and returns the new boxes in the same order, so a whole selection is
+# recomputed column-wise in one pass and written back in one go.
+
+def bounding_box(boxes):
+    """Return (left, top, right, bottom) around all boxes"""
+    return (min(x for x, _, _, _ in boxes), min(y for _, y, _, _ in boxes),
+            max(x + w for x, _, w, _ in boxes), max(y + h for _, y, _, h in boxes))
+
+
+def move_boxes(boxes, dx, dy):
+    return [(x + dx, y + dy, w, h) for x, y, w, h in boxes]
+
+
+def scale_boxes(boxes, factor):
+    """Scale sizes and spacing about the centre of the boxes' bounds"""
+    left, top, right, bottom = bounding_box(boxes)
+    cx, cy = (left + right) / 2, (top + bottom) / 2
+    return [(round(cx + (x - cx) * factor), round(cy + (y - cy) * factor),
+             max(1, round(w * factor)), max(1, round(h * factor)))
+            for x, y, w, h in boxes]
+
+
+def align_boxes(boxes, edge):
+    """Line boxes up on one edge (or centre line) of their common bounds
+
+    edge is one of 'left', 'center', 'right', 'top', 'middle', 'bottom'.
+    """
+    left, top, right, bottom = bounding_box(boxes)
+    if edge == 'left':
+        return [(left, y, w, h) for x, y, w, h in boxes]
+    if edge == 'center':
+        return [((left + right - w) // 2, y, w, h) for x, y, w, h in boxes]
+    if edge == 'right':
+        return [(right - w, y, w, h) for x, y, w, h in boxes]
+    if edge == 'top':
+        return [(x, top, w, h) for x, y, w, h in boxes]
+    if edge == 'middle':
+        return [(x, (top + bottom - h) // 2, w, h) for x, y, w, h in boxes]
+    if edge == 'bottom':
+        return [(x, bottom - h, w, h) for x, y, w, h in boxes]
+    raise ValueError(f"Unknown edge: {edge}")
+
+
+def distribute_boxes(boxes, axis):
+    """Space boxes evenly along axis ('x' or 'y'), keeping the outer two put"""
+    if len(boxes) < 3:
+        return list(boxes)
+    pos_i, size_i = (0, 2) if axis == 'x' else (1, 3)
+    order = sorted(range(len(boxes)), key=lambda k: boxes[k][pos_i])
+    first, last = boxes[order[0]], boxes[order[-1]]
+    span = last[pos_i] + last[size_i] - first[pos_i]
+    gap = (span - sum(boxes[k][size_i] for k in order)) / (len(boxes) - 1)
+    
+    result = list(boxes)
+    pos = first[pos_i]
+    for k in order:
+        box = list(boxes[k])
+        box[pos_i] = round(pos)
+        result[k] = tuple(box)
+        pos += box[size_i] + gap
+    return result
+
+
+def snap_boxes(boxes, grid):
+    """Move each box's top-left corner to the nearest grid point"""
+    half = grid // 2
+    return [((x + half) // grid * grid, (y + half) // grid * grid, w, h)
+            for x, y, w, h in boxes]
+
+
+class FrameScheduler:
+    """Coalesces redraw requests into at most one pending Tk callback"""
+
+    def __init__(self, master, callback, max_fps=30, continuous=False):
+        self.master = master
+        self.callback = callback
+        self.max_fps = max_fps          # None or 0 means uncapped
+        self.continuous = continuous    # keep polling even when nothing asks
+        self.requested = 0
+        self.ran = 0
+        self._pending = None
+        self._last_run = 0.0
+        if continuous:
+            self._schedule()
+
+    def request(self):
+        """Ask for a redraw; requests made before it runs are merged into one"""
+        self.requested += 1
+        if self._pending is None:
+            self._schedule()
+
+    def set_continuous(self, continuous):
+        """Switch between on-demand and fixed-rate polling"""
+        self.continuous = continuous
+        if continuous and self._pending is None:
+            self._schedule()
+
+    def cancel(self):
+        """Drop the pending redraw, if any"""
+        if self._pending is not None:
+            self.master.after_cancel(self._pending)
+            self._pending = None
+
+    def stats(self):
+        """Return how many redraws were requested and how many actually ran"""
+        return {'requested': self.requested, 'ran': self.ran}
+
+    def _schedule(self):
+        # Respect the frame-rate cap relative to the last redraw
+        delay = 0
+        if self.max_fps:
+            wait = self._last_run + 1.0 / self.max_fps - time.perf_counter()
+            delay = max(0, int(wait * 1000))
+        self._pending = self.master.after(delay, self._run)
+
+    def _run(self):
+        self._pending = None
+        self._last_run = time.perf_counter()
+        self.ran += 1
+        self.callback()
+        if self.continuous and self._pending is None:
+            self._schedule()
+
+
+class PreviewProfiler:
+    """Opt-in timing of preview passes and their pipeline stages
+
+    Keeps a rolling window of frame times and per-stage totals. While
+    disabled, stage() hands back a shared no-op context, so instrumented
+    code costs next to nothing.
+    """
+
+    _NULL = nullcontext()
+
+    def __init__(self, window=120):
+        self.enabled = False
+        self.frames = deque(maxlen=window)  # (end time, seconds, {stage: seconds})
+        self._current = None
+        self._frame_start = 0.0
+
+    def begin_frame(self):
+        if self.enabled:
+            self._current = {}
+            self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if self._current is None:
+            return
+        now = time.perf_counter()
+        self.frames.append((now, now - self._frame_start, self._current))
+        self._current = None
+
+    def stage(self, name):
+        """Context manager adding its duration to the named stage"""
+        if self._current is None:
+            return self._NULL
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._current[name] = self._current.get(name, 0.0) + time.perf_counter() - start
+
+    def summary(self):
+        """Return last/mean frame ms, redraws in the last second and mean stage ms"""
+        if not self.frames:
+            return None
+        now = time.perf_counter()
+        count = len(self.frames)
+        stages = {}
+        for _, _, frame_stages in self.frames:
+            for name, seconds in frame_stages.items():
+                stages[name] = stages.get(name, 0.0) + seconds
+        return {
+            'frame_ms': self.frames[-1][1] * 1000,
+            'mean_ms': sum(frame[1] for frame in self.frames) / count * 1000,
+            'redraws_per_sec': sum(1 for frame in self.frames if now - frame[0] <= 1.0),
+            'stages_ms': {name: total / count * 1000 for name, total in stages.items()},
+        }
+
+
+class ByteLRU:
+    """Least-recently-used mapping bounded by the bytes its values hold
+
+    Each value is stored with its size; once the total exceeds max_bytes
+    the least recently used entries are evicted.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes_held = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (nbytes, value)
+
+    def get(self, key):
+        """Return the value for key, marking it recently used, or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, value, nbytes):
+        self.pop(key)
+        self._entries[key] = (nbytes, value)
+        self.bytes_held += nbytes
+        # Evict least recently used entries, but never the one just added
+        while self.bytes_held > self.max_bytes and len(self._entries) > 1:
+            self.pop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def pop(self, key):
+        """Remove key if present and return its value"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self.bytes_held -= entry[0]
+        return entry[1]
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes_held = 0
+
+    def keys(self):
+        return list(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SpriteCache:
+    """Bounded LRU cache of ready-to-draw Tk bitmaps keyed by (path, width, height)
+
+    Entries are accounted at 4 bytes per pixel and the least recently used
+    ones are evicted once the total exceeds max_bytes. When its source
+    file's modification time changes, an entry is rebuilt, and the factory
+    gets the stale bitmap so it can update it in place.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.hits = 0
+        self.misses = 0
+        self._entries = ByteLRU(max_bytes)  # key -> (mtime, image)
+
+    def get(self, path, width, height, factory):
+        """Return the cached bitmap, calling factory(stale) to build it on a miss
+
+        stale is the outdated bitmap for the same key, or None.
+        """
+        key = (path, width, height)
+        mtime = file_mtime(path)
+        entry = self._entries.get(key)
+        stale = None
+        if entry is not None:
+            if entry[0] == mtime:
+                self.hits += 1
+                return entry[1]
+            stale = entry[1]
+        
+        self.misses += 1
+        image = factory(stale)
+        self._entries.put(key, (mtime, image), width * height * 4)
+        return image
+
+    def invalidate(self, path=None):
+        """Drop every entry for path, or the whole cache when path is None"""
+        for key in [k for k in self._entries.keys() if path is None or k[0] == path]:
+            self._entries.pop(key)
+
+    def stats(self):
+        """Return hit/miss/eviction counters and the bytes currently held"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'bytes': self._entries.bytes_held,
+        }
+
+    @property
+    def evictions(self):
+        return self._entries.evictions
+
+
+class PixelBridge:
+    """Moves pygame pixels into Tk PhotoImages with as few copies as possible
+
+    A surface is scaled into a pooled surface of the same format, its
+    pixel buffer is decoded once, reordering channels, into a pooled PIL
+    staging image, and that image is pasted into the PhotoImage. Pools and
+    photos are matched by exact size, so only rebuilds at a recent size
+    (a changed file, an edited tile chunk) reuse them; a live resize still
+    allocates all three at every new size. Opaque images go through RGB,
+    which skips the alpha channel in both the decode and Tk's transparency
+    handling. Palette and colour-keyed surfaces fall back to the tostring
+    route.
+    """
+
+    RGBA_RAW = {'RGBA', 'BGRA', 'ARGB', 'ABGR'}
+    RGB_RAW = {'RGB', 'BGR', 'RGBX', 'BGRX', 'XRGB', 'XBGR'}
+
+    def __init__(self, stage=None, max_buffers=16):
+        self.stage = stage or (lambda name: nullcontext())
+        self.max_buffers = max_buffers
+        self.in_place = 0
+        self.created = 0
+        self.fallbacks = 0
+        self._scaled = OrderedDict()   # (size, format) -> surface
+        self._staging = OrderedDict()  # (mode, size) -> PIL image
+
+    @staticmethod
+    def raw_mode(surface, alpha):
+        """Return the PIL raw mode naming a surface's byte layout, or None"""
+        bytesize = surface.get_bytesize()
+        if bytesize not in (3, 4):
+            return None
+        channels = {}
+        for name, mask, shift in zip('RGBA', surface.get_masks(), surface.get_shifts()):
+            if mask:
+                if mask >> shift != 0xff or shift % 8:
+                    return None
+                channels[shift // 8] = name if alpha or name != 'A' else 'X'
+        order = [channels.get(i, 'X') for i in range(bytesize)]
+        if sys.byteorder == 'big':
+            order.reverse()
+        return ''.join(order)
+
+    def to_photo(self, surface, width, height, opaque=False, photo=None):
+        """Return surface scaled to width x height as a Tk PhotoImage
+
+        photo, if it has the same size, is updated and returned instead of
+        creating a new one. opaque promises the image has no transparent
+        pixels.
+        """
+        pil_img = self.to_image(surface, width, height, opaque)
+        with self.stage('photoimage'):
+            if photo is not None and (photo.width(), photo.height()) == pil_img.size:
+                self.in_place += 1
+            else:
+                photo = ImageTk.PhotoImage(pil_img.mode, pil_img.size)
+                self.created += 1
+            photo.paste(pil_img)
+            return photo
+
+    def to_image(self, surface, width, height, opaque=False):
+        """Return surface scaled to width x height as an RGB or RGBA PIL image
+
+        The image is a pooled staging buffer, valid until the next call.
+        """
+        size = (width, height)
+        alpha = not opaque and surface.get_masks()[3] != 0
+        mode = 'RGBA' if alpha else 'RGB'
+        raw = self.raw_mode(surface, alpha) if surface.get_colorkey() is None else None
+        if raw not in (self.RGBA_RAW if alpha else self.RGB_RAW):
+            return self._to_image_copying(surface, size)
+        
+        if surface.get_size() != size:
+            with self.stage('scale'):
+                fmt = (size, surface.get_bitsize(), surface.get_masks(),
+                       surface.get_flags() & pygame.SRCALPHA)
+                # Spell out the masks: a SRCALPHA surface built from a
+                # template keeps its depth but not its channel order
+                scaled = self._reuse(self._scaled, fmt, lambda: pygame.Surface(
+                    size, fmt[3], fmt[1], fmt[2]))
+                surface = pygame.transform.scale(surface, size, scaled)
+        
+        with self.stage('pixels'):
+            staging = self._reuse(self._staging, (mode, size), lambda: Image.new(mode, size))
+            # Decode straight out of the surface's buffer, honouring its pitch
+            staging.frombytes(surface.get_buffer(), 'raw', raw, surface.get_pitch())
+        return staging
+
+    def _to_image_copying(self, surface, size):
+        self.fallbacks += 1
+        if surface.get_size() != size:
+            with self.stage('scale'):
+                surface = pygame.transform.scale(surface, size)
+        with self.stage('pixels'):
+            return Image.frombytes('RGBA', size, pygame.image.tostring(surface, 'RGBA'))
+
+    def _reuse(self, pool, key, create):
+        buffer = pool.get(key)
+        if buffer is None:
+            buffer = pool[key] = create()
+            if len(pool) > self.max_buffers:
+                pool.popitem(last=False)
+        else:
+            pool.move_to_end(key)
+        return buffer
+
+    def stats(self):
+        return {'in_place': self.in_place, 'created': self.created, 'fallbacks': self.fallbacks}
+
+
+class AssetStore:
+    """Registry of decoded images shared by every object that uses them
+
+    Each distinct file is decoded once and kept alive by reference counts;
+    objects refer to it by asset id. Releasing the last reference frees the
+    decoded surface.
+    """
+
+    def __init__(self):
+        self._next_id = 1
+        self._ids = {}     # absolute path -> asset id
+        self._assets = {}  # asset id -> {'path', 'surface', 'reader', 'mtime', 'refs'}
+
+    def acquire(self, path, surface=None, reader=None):
+        """Take a reference to the asset for path, decoding it if needed
+
+        A surface already decoded elsewhere (e.g. on a worker thread) can be
+        passed in to skip the decode. Alternatively reader, a callable
+        returning the encoded file bytes, defers decoding until the surface
+        is first asked for.
+        """
+        key = os.path.abspath(path)
+        asset_id = self._ids.get(key)
+        if asset_id is None:
+            if surface is None and reader is None:
+                surface = pygame.image.load(path)
+            asset_id = self._next_id
+            self._next_id += 1
+            self._ids[key] = asset_id
+            self._assets[asset_id] = {
+                'path': key,
+                'surface': surface,
+                'reader': reader,
+                'mtime': file_mtime(path),
+                'opaque': None,
+                'refs': 0,
+            }
+        self._assets[asset_id]['refs'] += 1
+        return asset_id
+
+    def release(self, asset_id):
+        """Drop a reference; the asset is freed when none remain"""
+        asset = self._assets[asset_id]
+        asset['refs'] -= 1
+        if asset['refs'] <= 0:
+            del self._assets[asset_id]
+            del self._ids[asset['path']]
+
+    def surface(self, asset_id):
+        """Return the decoded surface for an asset, decoding it on first use"""
+        asset = self._assets[asset_id]
+        if asset['surface'] is None:
+            data = io.BytesIO(asset['reader']())
+            asset['surface'] = pygame.image.load(data, os.path.basename(asset['path']))
+        return asset['surface']
+
+    def path(self, asset_id):
+        return self._assets[asset_id]['path']
+
+    def source_bytes(self, asset_id):
+        """Return the encoded image file, from disk or the embedded copy"""
+        asset = self._assets[asset_id]
+        try:
+            with open(asset['path'], 'rb') as f:
+                return f.read()
+        except OSError:
+            if asset['reader'] is None:
+                raise
+            return asset['reader']()
+
+    def refresh(self, asset_id):
+        """Re-decode an asset whose file changed on disk; True if it did
+
+        A file that has been moved or deleted keeps its current surface, or
+        the embedded copy if it was never decoded.
+        """
+        asset = self._assets[asset_id]
+        mtime = file_mtime(asset['path'])
+        if mtime is None or mtime == asset['mtime']:
+            return False
+        asset['surface'] = pygame.image.load(asset['path'])
+        asset['mtime'] = mtime
+        asset['opaque'] = None
+        return True
+
+    def opaque(self, asset_id):
+        """True if an asset has no transparent pixels; checked once per decode"""
+        asset = self._assets[asset_id]
+        if asset['opaque'] is None:
+            surface = self.surface(asset_id)
+            if surface.get_colorkey() is not None:
+                asset['opaque'] = False
+            elif not surface.get_flags() & pygame.SRCALPHA:
+                asset['opaque'] = True
+            else:
+                # Pixels with alpha above 254 are set in the mask
+                w, h = surface.get_size()
+                asset['opaque'] = pygame.mask.from_surface(surface, 254).count() == w * h
+        return asset['opaque']
+
+    def memory_usage(self):
+        """Return {asset id: decoded pixel bytes} for every live asset"""
+        return {
+            asset_id: (asset['surface'].get_pitch() * asset['surface'].get_height()
+                       if asset['surface'] is not None else 0)
+            for asset_id, asset in self._assets.items()
+        }
+
+    def stats(self):
+        """Return asset count, total references and decoded bytes"""
+        return {
+            'assets': len(self._assets),
+            'refs': sum(asset['refs'] for asset in self._assets.values()),
+            'bytes': sum(self.memory_usage().values()),
+        }
+
+    def __contains__(self, path):
+        return os.path.abspath(path) in self._ids
+
+    def __len__(self):
+        return len(self._assets)
+
+
+class SceneFile:
+    """Compact binary container for editor scenes (.gscene)
+
+    Layout, little-endian:
+      header   magic, version, object count, asset count
+      assets   per asset: blob offset, blob length, path (UTF-8)
+      columns  x, y, width, height as int32 arrays, asset index as uint32,
+               flags as uint8 (bit 0: dynamic)
+      names    NUL-separated UTF-8
+      tiles    (version 2) tile layer count, then per layer: columns, rows,
+               tile size, chunk size, tileset asset index and the int16
+               tile indices
+      blobs    each image file embedded as-is
+
+    Opening a scene maps the file and reads the columns in bulk; the image
+    blobs stay in the mapping until an asset is first decoded.
+    """
+
+    MAGIC = b'GSCN'
+    VERSION = 2
+    HEADER = struct.Struct('<4sHxxII')
+    ASSET = struct.Struct('<QQH')
+    TILEMAP = struct.Struct('<IIHHI')
+    FLAG_DYNAMIC = 1
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._parse()
+        except Exception:
+            self.close()
+            raise
+
+    def _parse(self):
+        mm = self._map
+        magic, version, count, asset_count = self.HEADER.unpack_from(mm, 0)
+        if magic != self.MAGIC:
+            raise ValueError("Not a scene file")
+        if version > self.VERSION:
+            raise ValueError(f"Scene file version {version} is newer than this editor")
+        pos = self.HEADER.size
+        
+        self.assets = []  # (path, blob offset, blob length)
+        for _ in range(asset_count):
+            offset, length, path_len = self.ASSET.unpack_from(mm, pos)
+            pos += self.ASSET.size
+            self.assets.append((mm[pos:pos + path_len].decode('utf-8'), offset, length))
+            pos += path_len
+        
+        def column(typecode):
+            nonlocal pos
+            values = array(typecode)
+            size = values.itemsize * count
+            values.frombytes(mm[pos:pos + size])
+            if sys.byteorder == 'big':
+                values.byteswap()
+            pos += size
+            return values
+        
+        self.x = column('i')
+        self.y = column('i')
+        self.width = column('i')
+        self.height = column('i')
+        self.asset = column('I')
+        self.flags = column('B')
+        
+        (names_len,) = struct.unpack_from('<I', mm, pos)
+        pos += 4
+        self.names = mm[pos:pos + names_len].decode('utf-8').split('\0') if count else []
+        self.count = count
+        pos += names_len
+        
+        # Version 1 files have no tile layers
+        self.tilemap = None  # dict of TileMap arguments, tileset as asset index
+        if version >= 2:
+            (layers,) = struct.unpack_from('<I', mm, pos)
+            pos += 4
+            if layers:
+                columns, rows, tile_size, chunk_size, tileset = self.TILEMAP.unpack_from(mm, pos)
+                pos += self.TILEMAP.size
+                tiles = array('h')
+                tiles.frombytes(mm[pos:pos + 2 * columns * rows])
+                if sys.byteorder == 'big':
+                    tiles.byteswap()
+                self.tilemap = {'columns': columns, 'rows': rows, 'tile_size': tile_size,
+                                'chunk_size': chunk_size, 'tileset': tileset, 'tiles': tiles}
+
+    def reader(self, index):
+        """Return a callable that reads an embedded asset's bytes from the map"""
+        _, offset, length = self.assets[index]
+        return lambda: self._map[offset:offset + length]
+
+    def close(self):
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    @classmethod
+    def save(cls, path, objects, assets, tilemap=None):
+        """Write objects and the tile layer, embedding every image they use
+        from the asset store"""
+        asset_index = {}
+        for obj in objects:
+            asset_index.setdefault(obj.asset, len(asset_index))
+        if tilemap is not None:
+            asset_index.setdefault(tilemap.asset, len(asset_index))
+        # Read every blob before writing: the target may be the scene that
+        # is currently mapped, so it is replaced rather than overwritten
+        blobs = [assets.source_bytes(asset_id) for asset_id in asset_index]
+        paths = [assets.path(asset_id).encode('utf-8') for asset_id in asset_index]
+        
+        columns = [array('i', (getattr(obj, attr) for obj in objects))
+                   for attr in ('x', 'y', 'width', 'height')]
+        columns.append(array('I', (asset_index[obj.asset] for obj in objects)))
+        columns.append(array('B', (cls.FLAG_DYNAMIC if obj.dynamic else 0 for obj in objects)))
+        if sys.byteorder == 'big':
+            for values in columns:
+                values.byteswap()
+        names = '\0'.join(obj.name for obj in objects).encode('utf-8')
+        
+        if tilemap is not None:
+            tiles = struct.pack('<I', 1) + cls.TILEMAP.pack(
+                tilemap.columns, tilemap.rows, tilemap.tile_size, tilemap.chunk_size,
+                asset_index[tilemap.asset]) + tilemap.tile_bytes()
+        else:
+            tiles = struct.pack('<I', 0)
+        
+        # Blobs go last, so their offsets follow from everything before them
+        offset = (cls.HEADER.size
+                  + sum(cls.ASSET.size + len(p) for p in paths)
+                  + sum(len(values) * values.itemsize for values in columns)
+                  + 4 + len(names) + len(tiles))
+        
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(objects), len(blobs)))
+            for blob, encoded_path in zip(blobs, paths):
+                f.write(cls.ASSET.pack(offset, len(blob), len(encoded_path)))
+                f.write(encoded_path)
+                offset += len(blob)
+            for values in columns:
+                values.tofile(f)
+            f.write(struct.pack('<I', len(names)))
+            f.write(names)
+            f.write(tiles)
+            for blob in blobs:
+                f.write(blob)
+        os.replace(tmp_path, path)
+
+
+class ExportCache:
+    """Content-addressed build cache for one export directory
+
+    Source images are hashed once per size and modification time and
+    exported under a name derived from their content, so an unchanged
+    image is never copied twice and two files that merely share a
+    basename can't overwrite each other. The hashes and the outputs of
+    the last build of each exported script are kept in a small JSON file
+    in the export directory, since several games may share one folder.
+    """
+
+    FILENAME = '.export_cache.json'
+    VERSION = 2
+
+    def __init__(self, export_dir):
+        self.export_dir = export_dir
+        self.sources = {}    # source path -> [size, mtime in ns, sha1]
+        self.outputs = {}    # script basename -> files its last build used
+        self.copied = 0
+        self.reused = 0
+        try:
+            with open(os.path.join(export_dir, self.FILENAME)) as f:
+                data = json.load(f)
+            if data.get('version') == self.VERSION:
+                self.sources = data['sources']
+                self.outputs = data['outputs']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def digest(self, path, fallback=None):
+        """Return the SHA-1 of a file's content, rehashing only if it changed
+
+        fallback() supplies the bytes when the file can't be read.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            if fallback is None:
+                raise
+            return hashlib.sha1(fallback()).hexdigest()
+        entry = self.sources.get(path)
+        if entry is not None and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return entry[2]
+        h = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        digest = h.hexdigest()
+        self.sources[path] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    @staticmethod
+    def output_name(path, digest):
+        """Export file name for a source with the given content hash"""
+        stem, ext = os.path.splitext(os.path.basename(path))
+        return f"{stem}-{digest[:12]}{ext.lower()}"
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(self.export_dir, name))
+
+    def store(self, name, path, fallback=None):
+        """Copy path into the export as name; fallback() supplies the bytes
+        when the source has gone missing"""
+        dest = os.path.join(self.export_dir, name)
+        tmp_path = dest + '.tmp'
+        try:
+            shutil.copyfile(path, tmp_path)
+        except OSError:
+            if fallback is None:
+                raise
+            with open(tmp_path, 'wb') as f:
+                f.write(fallback())
+        # Only complete files ever appear under a content-derived name
+        os.replace(tmp_path, dest)
+
+    def store_surface(self, name, surface):
+        """Save a surface into the export as name, e.g. an atlas page"""
+        dest = os.path.join(self.export_dir, name)
+        tmp_path = dest + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            # The name hint keeps the format the final extension asks for
+            pygame.image.save(surface, f, name)
+        os.replace(tmp_path, dest)
+
+    def finish(self, script, outputs):
+        """Record script's outputs, remove files no exported script uses
+        any more, then persist the cache"""
+        script = os.path.basename(script)
+        previous = set(self.outputs.pop(script, ()))
+        # A script deleted from the folder no longer holds on to its files
+        for other in list(self.outputs):
+            if not os.path.exists(os.path.join(self.export_dir, other)):
+                previous.update(self.outputs.pop(other))
+        self.outputs[script] = sorted(set(outputs))
+        in_use = {name for names in self.outputs.values() for name in names}
+        for name in previous - in_use:
+            try:
+                os.remove(os.path.join(self.export_dir, name))
+            except OSError:
+                pass
+        tmp_path = os.path.join(self.export_dir, self.FILENAME + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': self.VERSION, 'sources': self.sources,
+                       'outputs': self.outputs}, f, separators=(',', ':'))
+        os.replace(tmp_path, os.path.join(self.export_dir, self.FILENAME))
+
+
+class ImportJob:
+    """Decodes a batch of image files on a worker thread pool
+
+    Each distinct file is decoded once. Finished surfaces come back through
+    a queue as (indices, path, surface, error) so that only the Tk thread
+    touches editor state; indices are positions in the original path list.
+    """
+
+    def __init__(self, paths, known=(), max_workers=None):
+        self.paths = list(paths)
+        self.total = len(self.paths)
+        self.done = 0
+        self.cancelled = False
+        self.results = queue.Queue()
+        
+        groups = {}
+        for index, path in enumerate(self.paths):
+            groups.setdefault(os.path.abspath(path), []).append(index)
+        self._remaining = len(groups)
+        
+        from concurrent.futures import ThreadPoolExecutor
+        workers = max_workers or min(8, (os.cpu_count() or 1) + 1)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='decode')
+        # Resolve the lazily imported module here, not racing in the workers
+        load = pygame.image.load
+        for indices in groups.values():
+            path = self.paths[indices[0]]
+            if path in known:
+                # Already decoded by the asset store
+                self.results.put((indices, path, None, None))
+            else:
+                future = self._executor.submit(load, path)
+                future.add_done_callback(
+                    lambda f, indices=indices, path=path: self._on_done(f, indices, path)
+                )
+        self._executor.shutdown(wait=False)
+
+    def _on_done(self, future, indices, path):
+        if future.cancelled():
+            return
+        error = future.exception()
+        surface = None if error is not None else future.result()
+        self.results.put((indices, path, surface, error))
+
+    def drain(self, limit=64):
+        """Return up to limit finished results without blocking"""
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self.results.get_nowait())
+            except queue.Empty:
+                break
+        self._remaining -= len(batch)
+        self.done += sum(len(indices) for indices, _, _, _ in batch)
+        return batch
+
+    @property
+    def finished(self):
+        return self._remaining <= 0
+
+    def cancel(self):
+        """Stop handing out work; decodes already running are discarded"""
+        self.cancelled = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class SceneObject:
+    """A sprite placed in the scene
+
+    Geometry is stored once as plain ints; rect is derived from it on demand.
+    The item/tk_* slots hold preview state owned by the editor.
+    """
+
+    __slots__ = ('x', 'y', 'width', 'height', 'asset', 'path', 'name', 'dynamic',
+                 'item', 'label_item', 'item_kind', 'tk_img', 'tk_size')
+
+    def __init__(self, x, y, width, height, asset, path, name=None, dynamic=False):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.asset = asset
+        self.path = path
+        self.name = name if name is not None else os.path.basename(path)
+        self.dynamic = dynamic  # redrawn every frame in the exported game
+        self.item = None
+        self.label_item = None
+        self.item_kind = None
+        self.tk_img = None
+        self.tk_size = None
+
+    @property
+    def rect(self):
+        return pygame.Rect(self.x, self.y, self.width, self.height)
+
+    @property
+    def bounds(self):
+        """Return (left, top, right, bottom)"""
+        return (self.x, self.y, self.x + self.width, self.y + self.height)
+
+    def set_geometry(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    def contains(self, px, py):
+        return self.x <= px < self.x + self.width and self.y <= py < self.y + self.height
+
+
+class SpatialGrid:
+    """Uniform-grid spatial index over scene objects for hit-testing
+
+    Objects are bucketed into every cell their bounds overlap; objects that
+    would span more than max_cells cells are kept in a short side list
+    instead. Each object keeps the sequence number it was inserted with,
+    which follows its z-order in the scene, so queries return the topmost
+    objects first.
+    """
+
+    def __init__(self, cell_size=64, max_cells=256):
+        self.cell_size = cell_size
+        self.max_cells = max_cells
+        self._cells = {}     # (cx, cy) -> set of objects
+        self._entries = {}   # obj -> (cell keys, or None if oversized, seq)
+        self._large = set()
+        self._seq = 0
+
+    def insert(self, obj):
+        """Add an object above everything already indexed"""
+        self._seq += 1
+        self._place(obj, self._seq)
+
+    def update(self, obj):
+        """Re-bucket an object after it moved or was resized"""
+        cells, seq = self._entries[obj]
+        self._unplace(obj, cells)
+        self._place(obj, seq)
+
+    def remove(self, obj):
+        cells, _ = self._entries.pop(obj)
+        self._unplace(obj, cells)
+
+    def clear(self):
+        self._cells.clear()
+        self._entries.clear()
+        self._large.clear()
+
+    def pick(self, x, y):
+        """Return the topmost object containing the point, or None"""
+        cs = self.cell_size
+        best = None
+        best_seq = 0
+        for candidates in (self._cells.get((x // cs, y // cs), ()), self._large):
+            for obj in candidates:
+                seq = self._entries[obj][1]
+                if seq > best_seq and obj.contains(x, y):
+                    best = obj
+                    best_seq = seq
+        return best
+
+    def query(self, left, top, right, bottom):
+        """Return objects overlapping the rectangle, topmost first"""
+        found = set()
+        x0, y0, x1, y1 = self._cell_range(left, top, right, bottom)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self._cells.get((cx, cy))
+                if cell:
+                    found.update(cell)
+        found.update(self._large)
+        
+        hits = [obj for obj in found
+                if obj.x < right and obj.x + obj.width > left
+                and obj.y < bottom and obj.y + obj.height > top]
+        hits.sort(key=lambda obj: self._entries[obj][1], reverse=True)
+        return hits
+
+    def order(self, obj):
+        """Return an object's stacking key; higher values are drawn on top"""
+        return self._entries[obj][1]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _cell_range(self, left, top, right, bottom):
+        cs = self.cell_size
+        return left // cs, top // cs, (right - 1) // cs, (bottom - 1) // cs
+
+    def _place(self, obj, seq):
+        x0, y0, x1, y1 = self._cell_range(*obj.bounds)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > self.max_cells:
+            self._large.add(obj)
+            self._entries[obj] = (None, seq)
+            return
+        cells = [(cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)]
+        for key in cells:
+            self._cells.setdefault(key, set()).add(obj)
+        self._entries[obj] = (cells, seq)
+
+    def _unplace(self, obj, cells):
+        if cells is None:
+            self._large.discard(obj)
+            return
+        for key in cells:
+            cell = self._cells[key]
+            cell.discard(obj)
+            if not cell:
+                del self._cells[key]
+
+
+class TileMap:
+    """A tile layer: a grid of indices into one tileset image
+
+    Indices are kept in a flat row-major array('h'), -1 meaning empty, so
+    a million cells cost two megabytes. The grid is split into square
+    chunks of chunk_size tiles; a chunk is baked into a single surface the
+    first time it is drawn and re-baked only after one of its own tiles
+    changes. Zoomed out, chunks are baked from a halved, quartered, ...
+    copy of the tileset, so their cost follows the size they are drawn at
+    rather than the size of the level. Baked chunks live in an LRU bounded
+    by max_bytes, accounted at 4 bytes per pixel.
+    """
+
+    EMPTY = -1
+    MAX_INDEX = 32767  # largest value array('h') holds
+
+    def __init__(self, asset, path, tile_size, columns, rows, chunk_size=16,
+                 tiles=None, max_bytes=32 * 1024 * 1024):
+        self.asset = asset
+        self.path = path
+        self.tile_size = tile_size
+        self.columns = columns
+        self.rows = rows
+        self.chunk_size = chunk_size
+        self.tiles = tiles if tiles is not None else array('h', [self.EMPTY]) * (columns * rows)
+        self.changed = set()   # chunk keys edited since the editor last looked
+        self._baked = ByteLRU(max_bytes)  # (chunk x, chunk y, level) -> surface
+        self._tilesets = {}          # level -> (tileset, reduced copy)
+
+    @property
+    def bounds(self):
+        """Return (left, top, right, bottom)"""
+        return (0, 0, self.columns * self.tile_size, self.rows * self.tile_size)
+
+    def get(self, col, row):
+        return self.tiles[row * self.columns + col]
+
+    def set(self, col, row, index):
+        """Change one tile; returns True if anything changed"""
+        if not (0 <= col < self.columns and 0 <= row < self.rows):
+            return False
+        i = row * self.columns + col
+        if self.tiles[i] == index:
+            return False
+        self.tiles[i] = index
+        key = (col // self.chunk_size, row // self.chunk_size)
+        for baked in [baked for baked in self._baked.keys() if baked[:2] == key]:
+            self._baked.pop(baked)
+        self.changed.add(key)
+        return True
+
+    def invalidate(self):
+        """Forget every baked chunk, e.g. after the tileset changed"""
+        self._baked.clear()
+        self._tilesets.clear()
+
+    def level_for(self, zoom):
+        """Return how many times tiles can be halved and still cover zoom"""
+        level = 0
+        while self.tile_size >> (level + 1) >= self.tile_size * zoom:
+            level += 1
+        return level
+
+    def chunk_bounds(self, key):
+        """Return the (left, top, right, bottom) pixels covered by a chunk"""
+        span = self.chunk_size * self.tile_size
+        left, top = key[0] * span, key[1] * span
+        _, _, right, bottom = self.bounds
+        return left, top, min(left + span, right), min(top + span, bottom)
+
+    def chunks_in(self, left, top, right, bottom):
+        """Return the keys of chunks overlapping a pixel rectangle"""
+        span = self.chunk_size * self.tile_size
+        last_x = (self.columns - 1) // self.chunk_size
+        last_y = (self.rows - 1) // self.chunk_size
+        x0, y0 = max(0, left // span), max(0, top // span)
+        x1, y1 = min(last_x, (right - 1) // span), min(last_y, (bottom - 1) // span)
+        return [(cx, cy) for cy in range(y0, y1 + 1) for cx in range(x0, x1 + 1)]
+
+    def chunk_surface(self, key, tileset, level=0):
+        """Return a chunk's baked surface at a reduction level, baking it if
+        needed"""
+        baked_key = key + (level,)
+        surface = self._baked.get(baked_key)
+        if surface is None:
+            surface = self.bake(key, self.reduced_tileset(tileset, level), level)
+            self._baked.put(baked_key, surface, surface.get_width() * surface.get_height() * 4)
+        return surface
+
+    def reduced_tileset(self, tileset, level):
+        """Return tileset with every tile shrunk by 2 ** level"""
+        if level == 0:
+            return tileset
+        cached = self._tilesets.get(level)
+        if cached is not None and cached[0] is tileset:
+            return cached[1]
+        ts = self.tile_size
+        small = max(1, ts >> level)
+        columns = max(1, tileset.get_width() // ts)
+        rows = max(1, tileset.get_height() // ts)
+        tiles = tileset.subsurface((0, 0, min(tileset.get_width(), columns * ts),
+                                    min(tileset.get_height(), rows * ts)))
+        size = (columns * small, rows * small)
+        if tileset.get_bitsize() >= 24:
+            reduced = pygame.transform.smoothscale(tiles, size)
+        else:
+            reduced = pygame.transform.scale(tiles, size)
+        self._tilesets[level] = (tileset, reduced)
+        return reduced
+
+    def bake(self, key, tileset, level=0):
+        """Composite one chunk's tiles into a new surface in one blits call
+
+        At level > 0, tileset must be the matching reduced_tileset().
+        """
+        left, top, right, bottom = self.chunk_bounds(key)
+        col0, row0 = left // self.tile_size, top // self.tile_size
+        col1, row1 = right // self.tile_size, bottom // self.tile_size
+        ts = max(1, self.tile_size >> level)
+        surface = pygame.Surface(((col1 - col0) * ts, (row1 - row0) * ts), pygame.SRCALPHA)
+        tileset_columns = max(1, tileset.get_width() // ts)
+        # Copy RGBA as-is rather than blending onto the transparent chunk
+        flags = pygame.BLEND_RGBA_MAX if tileset.get_flags() & pygame.SRCALPHA else 0
+        tiles = self.tiles
+        blits = []
+        for row in range(row0, row1):
+            base = row * self.columns
+            for col in range(col0, col1):
+                index = tiles[base + col]
+                if index >= 0:
+                    area = ((index % tileset_columns) * ts, (index // tileset_columns) * ts, ts, ts)
+                    blits.append((tileset, ((col - col0) * ts, (row - row0) * ts), area, flags))
+        surface.blits(blits, doreturn=False)
+        return surface
+
+    def tile_bytes(self):
+        """Return the indices as little-endian int16 bytes"""
+        if sys.byteorder == 'big':
+            tiles = array('h', self.tiles)
+            tiles.byteswap()
+            return tiles.tobytes()
+        return self.tiles.tobytes()
+
+    def export_data(self, tileset_name):
+        """Return the tile layer as stored in exported scene data"""
+        return {
+            'tileset': tileset_name,
+            'tile_size': self.tile_size,
+            'columns': self.columns,
+            'rows': self.rows,
+            'chunk_size': self.chunk_size,
+            'tiles': base64.b64encode(self.tile_bytes()).decode('ascii'),
+        }
+
+
+# Tile layer support shared by the data-file runtime and exported scripts
+TILE_LAYER_SOURCE = '''
+class TileLayer:
+    """Tile indices exported by the editor, drawn from lazily baked chunks
+
+    Only chunks that actually get drawn are baked, and set_tile() drops
+    just the chunk it touches, so it is re-baked on its next draw.
+    """
+
+    def __init__(self, data, tileset):
+        self.tileset = tileset
+        self.tile_size = data['tile_size']
+        self.columns = data['columns']
+        self.rows = data['rows']
+        self.chunk_size = data['chunk_size']
+        self.tiles = array('h')
+        self.tiles.frombytes(base64.b64decode(data['tiles']))
+        if sys.byteorder == 'big':
+            self.tiles.byteswap()
+        self._tileset_columns = max(1, tileset.get_width() // self.tile_size)
+        self._flags = pygame.BLEND_RGBA_MAX if tileset.get_flags() & pygame.SRCALPHA else 0
+        self._baked = {}
+
+    def chunk_rect(self, key):
+        span = self.chunk_size * self.tile_size
+        rect = pygame.Rect(key[0] * span, key[1] * span, span, span)
+        return rect.clip((0, 0, self.columns * self.tile_size, self.rows * self.tile_size))
+
+    def chunk_surface(self, key):
+        surface = self._baked.get(key)
+        if surface is None:
+            surface = self._baked[key] = self._bake(key)
+        return surface
+
+    def _bake(self, key):
+        rect = self.chunk_rect(key)
+        surface = pygame.Surface(rect.size, pygame.SRCALPHA)
+        ts = self.tile_size
+        col0, row0 = rect.left // ts, rect.top // ts
+        blits = []
+        for row in range(row0, rect.bottom // ts):
+            base = row * self.columns
+            for col in range(col0, rect.right // ts):
+                index = self.tiles[base + col]
+                if index >= 0:
+                    area = ((index % self._tileset_columns) * ts,
+                            (index // self._tileset_columns) * ts, ts, ts)
+                    blits.append((self.tileset, ((col - col0) * ts, (row - row0) * ts),
+                                  area, self._flags))
+        surface.blits(blits, doreturn=False)
+        return surface.convert_alpha()
+
+    def draw(self, target, area=None):
+        """Blit the chunks overlapping area (default: all of target)"""
+        area = pygame.Rect(area) if area is not None else target.get_rect()
+        span = self.chunk_size * self.tile_size
+        x0, y0 = max(0, area.left // span), max(0, area.top // span)
+        x1 = min((self.columns - 1) // self.chunk_size, (area.right - 1) // span)
+        y1 = min((self.rows - 1) // self.chunk_size, (area.bottom - 1) // span)
+        clip = target.get_clip()
+        target.set_clip(area)
+        target.blits([(self.chunk_surface((cx, cy)), (cx * span, cy * span))
+                      for cy in range(y0, y1 + 1) for cx in range(x0, x1 + 1)],
+                     doreturn=False)
+        target.set_clip(clip)
+
+    def set_tile(self, col, row, index):
+        """Change one tile; returns the rect to clear and redraw with draw()"""
+        self.tiles[row * self.columns + col] = index
+        self._baked.pop((col // self.chunk_size, row // self.chunk_size), None)
+        return pygame.Rect(col * self.tile_size, row * self.tile_size,
+                           self.tile_size, self.tile_size)
+'''
+
+
+# Command line, frame loop timing and reports shared by the data-file
+# runtime and exported scripts
+PACING_SOURCE = '''
+def parse_args(argv=None):
+    """Command-line options understood by every exported game"""
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--benchmark', type=int, default=0, metavar='N',
+                        help="render N frames uncapped without a window, then print timings as JSON")
+    parser.add_argument('--redraw-all', action='store_true',
+                        help="repaint the whole scene every frame (worst case)")
+    parser.add_argument('--fps', type=int, default=60,
+                        help="frame-rate cap; 0 for none")
+    parser.add_argument('--fixed-step', type=float, default=0, metavar='HZ',
+                        help="run game updates on a fixed timestep at HZ")
+    parser.add_argument('--stats', action='store_true',
+                        help="print frame-pacing statistics as JSON on exit")
+    parser.add_argument('--output', metavar='FILE',
+                        help="write the JSON report to FILE instead of stdout")
+    # Ignore whatever else the platform passes along (e.g. macOS -psn_ ids)
+    options, _ = parser.parse_known_args(argv)
+    if options.benchmark:
+        # Headless and uncapped; must be set before pygame.init()
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        options.fps = 0
+    return options
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[min(len(sorted_values), max(1, rank)) - 1]
+
+
+def peak_memory():
+    """Peak resident set size in bytes, or None where it can't be read"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class FramePacer:
+    """Frame timing for the game loop
+
+    begin() starts a frame and returns (seconds since the last frame,
+    fixed steps due). With a fixed step, elapsed time is accumulated and
+    spent in whole steps, capped at max_lag per frame so a stall can't
+    snowball. end() records how long the frame took and applies the
+    frame-rate cap.
+    """
+
+    def __init__(self, fps=60, fixed_step=0, max_lag=0.25):
+        self.clock = pygame.time.Clock()
+        self.fps = fps
+        self.step = 1.0 / fixed_step if fixed_step else 0
+        self.max_lag = max_lag
+        self.accumulator = 0.0
+        self.work = []       # seconds spent producing each frame
+        self.intervals = []  # seconds from one frame start to the next
+        self.steps = {}      # fixed steps run in a frame -> number of frames
+        self.late = 0        # frames that started over 1.5 intervals late
+        self._last = None
+        self._start = None
+
+    def begin(self):
+        now = time.perf_counter()
+        elapsed = 0.0
+        if self._last is not None:
+            elapsed = now - self._last
+            self.intervals.append(elapsed)
+            target = self.step or (1.0 / self.fps if self.fps else 0)
+            if target and elapsed > 1.5 * target:
+                self.late += 1
+        self._last = self._start = now
+        
+        steps = 0
+        if self.step:
+            self.accumulator += min(elapsed, self.max_lag)
+            steps = int(self.accumulator // self.step)
+            self.accumulator -= steps * self.step
+            self.steps[steps] = self.steps.get(steps, 0) + 1
+        return elapsed, steps
+
+    def end(self):
+        self.work.append(time.perf_counter() - self._start)
+        if self.fps:
+            self.clock.tick(self.fps)
+
+    def report(self, **extra):
+        """Return frame and pacing statistics as a JSON-ready dict"""
+        work = sorted(self.work)
+        intervals = sorted(self.intervals)
+        ms = lambda seconds: round(seconds * 1000, 3)
+        result = {
+            'frames': len(work),
+            'mean_ms': ms(sum(work) / len(work)) if work else 0.0,
+            'p50_ms': ms(percentile(work, 0.50)),
+            'p95_ms': ms(percentile(work, 0.95)),
+            'p99_ms': ms(percentile(work, 0.99)),
+            'max_ms': ms(work[-1]) if work else 0.0,
+            'peak_memory_bytes': peak_memory(),
+        }
+        if intervals:
+            mean = sum(intervals) / len(intervals)
+            result['pacing'] = {
+                'fps': round(1 / mean, 2) if mean else None,
+                'interval_mean_ms': ms(mean),
+                'interval_p99_ms': ms(percentile(intervals, 0.99)),
+                'interval_stdev_ms': ms((sum((i - mean) ** 2 for i in intervals) / len(intervals)) ** 0.5),
+                'late_frames': self.late,
+            }
+            if self.step:
+                result['pacing']['fixed_step_hz'] = round(1 / self.step, 3)
+                result['pacing']['steps_per_frame'] = {str(k): v for k, v in sorted(self.steps.items())}
+        result.update(extra)
+        return result
+
+
+def write_report(report, path=None):
+    text = json.dumps(report, indent=2)
+    if path:
+        with open(path, 'w') as f:
+            f.write(text + '\\n')
+    else:
+        print(text)
+'''
+
+
+# Fixed runtime written next to data-mode exports. The generated launcher
+# only names its scene file, so the exported code stays the same size
+# however many objects the scene holds.
+RUNTIME_MODULE = 'scene_runtime'
+RUNTIME_SOURCE = '''"""Runtime for scenes exported by the game editor
+
+Loads a .scene.json file in one pass, composites the tile layer and
+static objects onto a cached background once, and each frame repaints
+only the rectangles of objects marked dynamic.
+
+Run with --help for the benchmark and frame-pacing options.
+"""
+import base64
+import json
+import math
+import os
+import sys
+import time
+from array import array
+
+# Keep stdout clean for --benchmark reports
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+import pygame
+
+''' + TILE_LAYER_SOURCE + PACING_SOURCE + '''
+
+def resource_path(relative_path):
+    """Get absolute path to resource, works for dev and for PyInstaller"""
+    try:
+        # PyInstaller creates a temp folder and stores path in _MEIPASS
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.dirname(os.path.abspath(sys.argv[0]))
+    return os.path.join(base_path, relative_path)
+
+
+def load_sprites(data):
+    """Return one ready-to-blit surface per entry in the sprite table"""
+    if data.get('atlases'):
+        atlases = [pygame.image.load(resource_path(name)).convert_alpha()
+                   for name in data['atlases']]
+        return [atlases[a].subsurface((x, y, w, h)) for a, x, y, w, h in data['sprites']]
+    
+    images = [pygame.image.load(resource_path(name)).convert_alpha()
+              for name in data['images']]
+    return [pygame.transform.scale(images[i], (w, h)) for i, w, h in data['sprites']]
+
+
+def read_scene(scene_file):
+    with open(resource_path(scene_file)) as f:
+        return json.load(f)
+
+
+def load_tile_layer(data):
+    """Return the scene's TileLayer, or None if it has none; needs a display"""
+    tilemap = data.get('tilemap')
+    if not tilemap:
+        return None
+    tileset = pygame.image.load(resource_path(tilemap['tileset'])).convert_alpha()
+    return TileLayer(tilemap, tileset)
+
+
+def build_blit_sequence(data):
+    """Return (surface, position) pairs for Surface.blits; needs a display"""
+    sprites = load_sprites(data)
+    # objects is a flat [sprite, x, y, sprite, x, y, ...] list
+    flat = data['objects']
+    return [(sprites[flat[i]], (flat[i + 1], flat[i + 2]))
+            for i in range(0, len(flat), 3)]
+
+
+def build_layers(data, blit_sequence, tile_layer=None):
+    """Bake the tile layer and static objects into a background surface
+
+    Everything below the first dynamic object is composited once; the rest
+    is the overlay drawn on top. Returns (background, overlay, overlay items
+    touching a dirty rect, dirty rects).
+    """
+    dynamic = sorted(data.get('dynamic', []))
+    first_dynamic = dynamic[0] if dynamic else len(blit_sequence)
+    
+    background = pygame.Surface(tuple(data['size'])).convert()
+    background.fill(tuple(data['background']))
+    if tile_layer is not None:
+        # Only the chunks under the window are baked
+        tile_layer.draw(background)
+    background.blits(blit_sequence[:first_dynamic], doreturn=False)
+    
+    dirty_rects = [pygame.Rect(blit_sequence[i][1], blit_sequence[i][0].get_size())
+                   for i in dynamic]
+    overlay = blit_sequence[first_dynamic:]
+    overlay_dirty = [item for item in overlay
+                     if pygame.Rect(item[1], item[0].get_size()).collidelist(dirty_rects) != -1]
+    return background, overlay, overlay_dirty, dirty_rects
+
+
+def run(scene_file, caption='My Game', argv=None, update=None):
+    """Show a scene until the window is closed
+
+    update(dt), if given, runs every frame with the seconds elapsed, or
+    once per due step with --fixed-step.
+    """
+    options = parse_args(argv)
+    load_start = time.perf_counter()
+    pygame.init()
+    data = read_scene(scene_file)
+    screen = pygame.display.set_mode(tuple(data['size']))
+    pygame.display.set_caption(caption)
+    
+    blit_sequence = build_blit_sequence(data)
+    tile_layer = load_tile_layer(data)
+    background, overlay, overlay_dirty, dirty_rects = build_layers(data, blit_sequence, tile_layer)
+    expose_events = {pygame.VIDEOEXPOSE, getattr(pygame, 'WINDOWEXPOSED', pygame.VIDEOEXPOSE)}
+    load_seconds = time.perf_counter() - load_start
+    
+    pacer = FramePacer(options.fps, options.fixed_step)
+    full_redraw = True
+    running = True
+    while running:
+        dt, steps = pacer.begin()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type in expose_events:
+                full_redraw = True
+        
+        if update is not None:
+            if pacer.step:
+                for _ in range(steps):
+                    update(pacer.step)
+            else:
+                update(dt)
+        
+        if full_redraw or options.redraw_all:
+            screen.blit(background, (0, 0))
+            screen.blits(overlay, doreturn=False)
+            pygame.display.flip()
+            full_redraw = False
+        elif dirty_rects:
+            # Only the dynamic objects' rectangles are repainted and presented.
+            # The overlay is clipped to each restored rectangle so sprites
+            # reaching past it aren't blended over themselves again.
+            for rect in dirty_rects:
+                screen.blit(background, rect, rect)
+                screen.set_clip(rect)
+                screen.blits(overlay_dirty, doreturn=False)
+            screen.set_clip(None)
+            pygame.display.update(dirty_rects)
+        pacer.end()
+        if options.benchmark and len(pacer.work) >= options.benchmark:
+            running = False
+    
+    video_driver = pygame.display.get_driver()
+    pygame.quit()
+    if options.benchmark or options.stats:
+        write_report(pacer.report(load_ms=round(load_seconds * 1000, 3), objects=len(blit_sequence),
+                                  video_driver=video_driver), options.output)
+'''
+
 
 class GameEditor:
-    def __init__(self, master):
+    def __init__(self, master, max_fps=30, continuous=False):
         self.master = master
         master.title("Construct-like Editor")
-        master.geometry("1000x600")
+        master.geometry("1000x720")
 
         # Store window components in separate frames
-        self.left_frame = tk.Frame(master, width=600, height=600)
+        self.left_frame = tk.Frame(master, width=600, height=720)
         self.left_frame.grid(row=0, column=0, sticky="nsew")
         self.left_frame.grid_propagate(False)  # Prevent frame from shrinking
         
-        self.right_frame = tk.Frame(master, width=400, height=600)
+        self.right_frame = tk.Frame(master, width=400, height=720)
         self.right_frame.grid(row=0, column=1, sticky="nsew")
         
         # Configure grid weights
@@ -25,48 +1668,175 @@ class GameEditor:
         master.grid_columnconfigure(1, weight=1)
         master.grid_rowconfigure(0, weight=1)
 
-        # Initialize Pygame (without embedding in Tkinter)
-        os.environ['SDL_VIDEODRIVER'] = ''  # Let SDL choose the best driver
-        pygame.init()
+        # Pygame is only used for image loading and transforms, which need no
+        # pygame.init(); the display, audio and joystick subsystems stay off
+        
+        # Set up the preview canvas as a scrollable, zoomable viewport
+        view_frame = tk.Frame(self.left_frame)
+        view_frame.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
+        view_frame.grid_rowconfigure(0, weight=1)
+        view_frame.grid_columnconfigure(0, weight=1)
+        
+        self.canvas = tk.Canvas(view_frame, width=600, height=400, bg='white')
+        self.canvas.grid(row=0, column=0, sticky='nsew')
         
-        # Set up the preview canvas
-        self.canvas = tk.Canvas(self.left_frame, width=600, height=400, bg='white')
-        self.canvas.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
+        hbar = tk.Scrollbar(view_frame, orient=tk.HORIZONTAL, command=self.canvas.xview)
+        hbar.grid(row=1, column=0, sticky='ew')
+        vbar = tk.Scrollbar(view_frame, orient=tk.VERTICAL, command=self.canvas.yview)
+        vbar.grid(row=0, column=1, sticky='ns')
+        
+        # The scroll callbacks fire on every pan, resize or scrollregion change,
+        # which is exactly when the set of visible objects may change
+        def on_xscroll(*args):
+            hbar.set(*args)
+            self.on_view_changed()
+        
+        def on_yscroll(*args):
+            vbar.set(*args)
+            self.on_view_changed()
+        
+        self.canvas.config(xscrollcommand=on_xscroll, yscrollcommand=on_yscroll)
+        
+        # Click to pick, Shift-click to add/remove, drag on empty space to
+        # select with a marquee
         self.canvas.bind("<Button-1>", self.on_canvas_click)
+        self.canvas.bind("<B1-Motion>", self.on_canvas_drag)
+        self.canvas.bind("<ButtonRelease-1>", self.on_canvas_release)
+        # In tile paint mode the right button erases tiles
+        self.canvas.bind("<Button-3>", lambda e: self.paint_tile(e, TileMap.EMPTY))
+        self.canvas.bind("<B3-Motion>", lambda e: self.paint_tile(e, TileMap.EMPTY))
+        self.canvas.bind("<Button-2>", lambda e: self.canvas.scan_mark(e.x, e.y))
+        self.canvas.bind("<B2-Motion>", lambda e: self.canvas.scan_dragto(e.x, e.y, gain=1))
+        self.canvas.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.canvas.bind("<Shift-MouseWheel>", self.on_mouse_wheel)
+        self.canvas.bind("<Control-MouseWheel>", self.on_mouse_wheel)
+        for button in (4, 5):
+            for modifier in ("", "Shift-", "Control-"):
+                self.canvas.bind(f"<{modifier}Button-{button}>", self.on_mouse_wheel)
         
         # Setup right side with separate frames for properties and toolbox
         self.properties_frame = tk.LabelFrame(self.right_frame, text="Properties", width=380, height=300)
         self.properties_frame.pack(pady=10, padx=10, fill=tk.BOTH)
         self.properties_frame.pack_propagate(False)  # Prevent frame from shrinking
 
+        self.arrange_frame = tk.LabelFrame(self.right_frame, text="Arrange Selection")
+        self.arrange_frame.pack(padx=10, fill=tk.X)
+
         self.toolbox_frame = tk.LabelFrame(self.right_frame, text="Toolbox", width=380, height=200)
         self.toolbox_frame.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
         
-        # Game objects list and selection tracking
+        # Game objects list and selection tracking; selected_object is the
+        # one shown in the properties panel, selection holds all of them
         self.objects = []
+        self.selection = set()
         self.selected_object = None
         self.selected_index = None
+        self._marquee = None
+        
+        # Retained-mode preview state: objects waiting to be redrawn, plus
+        # outline items for the visible part of the selection
+        self._dirty = {}
+        self._selection_items = {}  # obj -> [item, coords, is primary]
+        self._raise_selection = False
+        
+        # Viewport: only objects overlapping the visible world rectangle get
+        # canvas items; below lod_zoom they are drawn as plain rectangles
+        self.zoom = 1.0
+        self.lod_zoom = 0.5
+        self._visible = set()
+        self._view = None
+        self._extent = [0, 0, 600, 400]
+        self._scrollregion = None
+        
+        # All redraws go through one scheduler so any number of edits
+        # between frames collapse into a single preview pass
+        self.scheduler = FrameScheduler(master, self.update_preview,
+                                        max_fps=max_fps, continuous=continuous)
+        
+        # Frame timing, shown in the status bar when enabled (F12)
+        self.profiler = PreviewProfiler()
+        self._profile_capture = None
+        
+        # Decoded images and scaled bitmaps, shared by every object using
+        # the same file (and size)
+        self.assets = AssetStore()
+        self.sprite_cache = SpriteCache()
+        self.pixels = PixelBridge(stage=self.profiler.stage)
+        
+        # Grid index kept in step with self.objects for click picking
+        self.spatial = SpatialGrid()
+        
+        # Background image import in progress, if any
+        self._import_job = None
+        self._import_errors = []
+        
+        # Memory-mapped scene file backing lazily decoded assets
+        self._scene_file = None
+        
+        # Optional tile layer drawn below every sprite, and the canvas image
+        # shown for each of its chunks that is in view
+        self.tilemap = None
+        self._tile_items = {}  # chunk key -> [item, PhotoImage, drawn size]
         
         # Create UI components
         self.create_toolbox()
         self.create_properties_panel()
-        
-        # Set up periodic refreshing of the canvas
-        self.update_preview()
+        self.create_arrange_panel()
+        self.create_status_bar()
     
     def create_toolbox(self):
+        scene_buttons = tk.Frame(self.toolbox_frame)
+        scene_buttons.pack(pady=5, padx=10, fill=tk.X)
+        ttk.Button(scene_buttons, text="Open Scene", command=self.open_scene).pack(
+            side=tk.LEFT, fill=tk.X, expand=True)
+        ttk.Button(scene_buttons, text="Save Scene", command=self.save_scene).pack(
+            side=tk.LEFT, fill=tk.X, expand=True, padx=(5, 0))
+        
         btn_add_sprite = ttk.Button(self.toolbox_frame, text="Add Sprite", command=self.add_sprite)
         btn_add_sprite.pack(pady=5, padx=10, fill=tk.X)
         
+        btn_import_folder = ttk.Button(self.toolbox_frame, text="Import Folder", command=self.import_folder)
+        btn_import_folder.pack(pady=5, padx=10, fill=tk.X)
+        
+        # Import progress, only shown while a background import is running
+        self.import_frame = tk.Frame(self.toolbox_frame)
+        self.import_progress = ttk.Progressbar(self.import_frame, mode='determinate')
+        self.import_progress.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        ttk.Button(self.import_frame, text="Cancel", command=self.cancel_import).pack(side=tk.RIGHT, padx=(5, 0))
+        self._import_anchor = btn_import_folder
+        
         btn_export = ttk.Button(self.toolbox_frame, text="Export to Python", command=self.export_python)
         btn_export.pack(pady=5, padx=10, fill=tk.X)
         
         btn_export_dmg = ttk.Button(self.toolbox_frame, text="Export to DMG", command=self.export_dmg)
         btn_export_dmg.pack(pady=5, padx=10, fill=tk.X)
         
+        # Export options
+        self.export_atlas = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.toolbox_frame, text="Pack sprites into texture atlas",
+                        variable=self.export_atlas).pack(padx=10, anchor='w')
+        self.export_data = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.toolbox_frame, text="Export scene as data file + runtime",
+                        variable=self.export_data).pack(padx=10, anchor='w')
+        
+        self.show_stats = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.toolbox_frame, text="Show performance stats (F12)", variable=self.show_stats,
+                        command=lambda: self.toggle_profiler(self.show_stats.get())).pack(padx=10, anchor='w')
+        
         btn_delete = ttk.Button(self.toolbox_frame, text="Delete Selected", command=self.delete_selected)
         btn_delete.pack(pady=5, padx=10, fill=tk.X)
         
+        # Tile layer: with Paint on, the left button paints the chosen tile
+        # and the right button erases
+        tile_row = tk.Frame(self.toolbox_frame)
+        tile_row.pack(pady=5, padx=10, fill=tk.X)
+        ttk.Button(tile_row, text="New Tile Layer", command=self.new_tile_layer).pack(side=tk.LEFT)
+        ttk.Label(tile_row, text="Tile:").pack(side=tk.LEFT, padx=(5, 0))
+        self.tile_index = tk.IntVar(value=0)
+        ttk.Spinbox(tile_row, from_=0, to=TileMap.MAX_INDEX, width=5, textvariable=self.tile_index).pack(side=tk.LEFT)
+        self.tile_paint = tk.BooleanVar(value=False)
+        ttk.Checkbutton(tile_row, text="Paint", variable=self.tile_paint).pack(side=tk.LEFT, padx=(5, 0))
+        
         # Add object list
         self.obj_list_frame = tk.Frame(self.toolbox_frame)
         self.obj_list_frame.pack(pady=5, padx=10, fill=tk.BOTH, expand=True)
@@ -80,22 +1850,95 @@ class GameEditor:
         scrollbar = tk.Scrollbar(listbox_frame)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        self.obj_listbox = tk.Listbox(listbox_frame)
+        self.obj_listbox = tk.Listbox(listbox_frame, selectmode=tk.EXTENDED, exportselection=False)
         self.obj_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         self.obj_listbox.config(yscrollcommand=scrollbar.set)
         scrollbar.config(command=self.obj_listbox.yview)
         
-        self.obj_listbox.bind('<<ListboxSelect>>', self.on_select_from_list)
+        self.obj_listbox.bind('<<ListboxSelect>>', self.on_select_from_list)
+
+    def create_status_bar(self):
+        """Performance readout, hidden until profiling is switched on"""
+        self.status_frame = tk.Frame(self.master, relief=tk.SUNKEN, bd=1)
+        self.status_label = tk.Label(self.status_frame, anchor='w', font=('TkFixedFont', 9))
+        self.status_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        ttk.Button(self.status_frame, text="Capture Profile",
+                   command=self.capture_profile).pack(side=tk.RIGHT)
+        self.master.bind('<F12>', lambda e: self.toggle_profiler())
+
+    def toggle_profiler(self, enabled=None):
+        """Show or hide the performance status bar"""
+        self.profiler.enabled = not self.profiler.enabled if enabled is None else enabled
+        self.profiler.frames.clear()
+        self.show_stats.set(self.profiler.enabled)
+        if self.profiler.enabled:
+            self.status_frame.grid(row=1, column=0, columnspan=2, sticky='ew')
+            self.status_label.configure(text="Waiting for a redraw...")
+            self.invalidate()
+        else:
+            self.status_frame.grid_remove()
+
+    def update_status_bar(self):
+        summary = self.profiler.summary()
+        if summary is None:
+            return
+        stages = "  ".join(f"{name} {ms:.2f}" for name, ms in sorted(summary['stages_ms'].items()))
+        cache = self.sprite_cache.stats()
+        lookups = cache['hits'] + cache['misses']
+        hit_rate = cache['hits'] / lookups * 100 if lookups else 0.0
+        self.status_label.configure(text=(
+            f"frame {summary['frame_ms']:.2f} ms (avg {summary['mean_ms']:.2f})  "
+            f"{summary['redraws_per_sec']} redraws/s  "
+            f"{len(self.objects)} objects ({len(self._visible)} visible)  "
+            f"cache {hit_rate:.0f}% hit  |  {stages or 'no stages'} ms"
+        ))
+
+    def capture_profile(self, frames=60):
+        """Record a cProfile capture over the next frames and save it to disk"""
+        if self._profile_capture is not None:
+            return
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".prof",
+            filetypes=[("Profile data", "*.prof")],
+            title="Save Profile Capture"
+        )
+        if not file_path:
+            return
+        
+        # Keep frames coming while recording, even in on-demand mode
+        import cProfile
+        profile = cProfile.Profile()
+        self._profile_capture = {
+            'profile': profile,
+            'frames': frames,
+            'path': file_path,
+            'continuous': self.scheduler.continuous,
+        }
+        self.scheduler.set_continuous(True)
+        profile.enable()
+
+    def finish_profile_capture(self):
+        capture = self._profile_capture
+        self._profile_capture = None
+        capture['profile'].disable()
+        self.scheduler.set_continuous(capture['continuous'])
+        try:
+            capture['profile'].dump_stats(capture['path'])
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not save profile: {e}")
+            return
+        messagebox.showinfo("Profile Captured", f"Profile saved to {capture['path']}\n"
+                            f"Inspect it with: python -m pstats {capture['path']}")
 
     def on_select_from_list(self, event):
         selection = self.obj_listbox.curselection()
         if selection:
-            index = selection[0]
-            if 0 <= index < len(self.objects):
-                self.selected_object = self.objects[index]
-                self.selected_index = index
-                self.update_property_display()
-                self.update_preview()
+            objs = [self.objects[i] for i in selection if 0 <= i < len(self.objects)]
+            # The row clicked last becomes the primary selection
+            active = self.obj_listbox.index(tk.ACTIVE)
+            primary = self.objects[active] if active in selection else objs[0]
+            self.set_selection(objs, primary, sync_list=False)
+            self.see_object(primary)
     
     def create_properties_panel(self):
         properties_inner = tk.Frame(self.properties_frame)
@@ -104,6 +1947,11 @@ class GameEditor:
         # Create property fields with proper labels
         prop_row = 0
         
+        ttk.Label(properties_inner, text="Name:").grid(row=prop_row, column=0, sticky='w', pady=2)
+        self.prop_name = ttk.Entry(properties_inner, width=10)
+        self.prop_name.grid(row=prop_row, column=1, sticky='ew', padx=5, pady=2)
+        prop_row += 1
+        
         ttk.Label(properties_inner, text="X Position:").grid(row=prop_row, column=0, sticky='w', pady=2)
         self.prop_x = ttk.Entry(properties_inner, width=10)
         self.prop_x.grid(row=prop_row, column=1, sticky='ew', padx=5, pady=2)
@@ -129,6 +1977,14 @@ class GameEditor:
         self.prop_image.grid(row=prop_row, column=1, sticky='ew', padx=5, pady=2)
         prop_row += 1
         
+        # Static objects are baked into the exported game's background
+        self.prop_dynamic = tk.BooleanVar(value=False)
+        self.prop_dynamic_check = ttk.Checkbutton(
+            properties_inner, text="Dynamic (redrawn every frame)", variable=self.prop_dynamic
+        )
+        self.prop_dynamic_check.grid(row=prop_row, column=0, columnspan=2, sticky='w', pady=2)
+        prop_row += 1
+        
         # Configure column weights
         properties_inner.columnconfigure(1, weight=1)
         
@@ -141,6 +1997,7 @@ class GameEditor:
 
     def clear_properties(self):
         """Clear and disable property fields when no object is selected"""
+        self.prop_name.delete(0, tk.END)
         self.prop_x.delete(0, tk.END)
         self.prop_y.delete(0, tk.END)
         self.prop_width.delete(0, tk.END)
@@ -148,23 +2005,29 @@ class GameEditor:
         self.prop_image.configure(state='normal')
         self.prop_image.delete(0, tk.END)
         self.prop_image.configure(state='readonly')
+        self.prop_dynamic.set(False)
         
         # Disable fields when no selection
         if self.selected_object is None:
+            self.prop_name.configure(state='disabled')
             self.prop_x.configure(state='disabled')
             self.prop_y.configure(state='disabled')
             self.prop_width.configure(state='disabled')
             self.prop_height.configure(state='disabled')
+            self.prop_dynamic_check.configure(state='disabled')
         else:
+            self.prop_name.configure(state='normal')
             self.prop_x.configure(state='normal')
             self.prop_y.configure(state='normal')
             self.prop_width.configure(state='normal')
             self.prop_height.configure(state='normal')
+            self.prop_dynamic_check.configure(state='normal')
 
     def update_property_display(self):
         """Update the property panel with the selected object's values"""
         if self.selected_object:
             # Enable and clear fields
+            self.prop_name.configure(state='normal')
             self.prop_x.configure(state='normal')
             self.prop_y.configure(state='normal')
             self.prop_width.configure(state='normal')
@@ -172,88 +2035,419 @@ class GameEditor:
             self.clear_properties()
             
             # Set values
-            self.prop_x.insert(0, str(self.selected_object['x']))
-            self.prop_y.insert(0, str(self.selected_object['y']))
-            self.prop_width.insert(0, str(self.selected_object['width']))
-            self.prop_height.insert(0, str(self.selected_object['height']))
+            self.prop_name.insert(0, self.selected_object.name)
+            self.prop_x.insert(0, str(self.selected_object.x))
+            self.prop_y.insert(0, str(self.selected_object.y))
+            self.prop_width.insert(0, str(self.selected_object.width))
+            self.prop_height.insert(0, str(self.selected_object.height))
+            self.prop_dynamic.set(self.selected_object.dynamic)
             
             self.prop_image.configure(state='normal')
-            self.prop_image.insert(0, os.path.basename(self.selected_object['path']))
+            self.prop_image.insert(0, os.path.basename(self.selected_object.path))
             self.prop_image.configure(state='readonly')
 
-    def add_sprite(self):
-        file_path = filedialog.askopenfilename(filetypes=[("Image Files", "*.png *.jpg *.jpeg *.bmp")])
+    def create_arrange_panel(self):
+        """Bulk move, scale, snap, align and distribute for the selection"""
+        inner = tk.Frame(self.arrange_frame)
+        inner.pack(fill=tk.X, padx=10, pady=5)
+        
+        self.selection_label = ttk.Label(inner, text="Nothing selected")
+        self.selection_label.grid(row=0, column=0, columnspan=4, sticky='w')
+        
+        ttk.Label(inner, text="Move by:").grid(row=1, column=0, sticky='w', pady=2)
+        self.move_dx = ttk.Entry(inner, width=6)
+        self.move_dx.insert(0, "0")
+        self.move_dx.grid(row=1, column=1, padx=2)
+        self.move_dy = ttk.Entry(inner, width=6)
+        self.move_dy.insert(0, "0")
+        self.move_dy.grid(row=1, column=2, padx=2)
+        ttk.Button(inner, text="Move", command=self.move_selection).grid(row=1, column=3, sticky='ew')
+        
+        ttk.Label(inner, text="Scale %:").grid(row=2, column=0, sticky='w', pady=2)
+        self.scale_percent = ttk.Entry(inner, width=6)
+        self.scale_percent.insert(0, "100")
+        self.scale_percent.grid(row=2, column=1, padx=2)
+        ttk.Button(inner, text="Scale", command=self.scale_selection).grid(row=2, column=3, sticky='ew')
+        
+        ttk.Label(inner, text="Grid:").grid(row=3, column=0, sticky='w', pady=2)
+        self.snap_size = ttk.Entry(inner, width=6)
+        self.snap_size.insert(0, "16")
+        self.snap_size.grid(row=3, column=1, padx=2)
+        ttk.Button(inner, text="Snap", command=self.snap_selection).grid(row=3, column=3, sticky='ew')
+        inner.columnconfigure(3, weight=1)
+        
+        align_row = tk.Frame(self.arrange_frame)
+        align_row.pack(fill=tk.X, padx=10)
+        for edge in ('left', 'center', 'right', 'top', 'middle', 'bottom'):
+            ttk.Button(align_row, text=edge.title(), width=6,
+                       command=lambda e=edge: self.arrange_selection(align_boxes, e)).pack(
+                side=tk.LEFT, fill=tk.X, expand=True)
+        
+        distribute_row = tk.Frame(self.arrange_frame)
+        distribute_row.pack(fill=tk.X, padx=10, pady=(0, 5))
+        ttk.Button(distribute_row, text="Distribute Horizontally",
+                   command=lambda: self.arrange_selection(distribute_boxes, 'x')).pack(
+            side=tk.LEFT, fill=tk.X, expand=True)
+        ttk.Button(distribute_row, text="Distribute Vertically",
+                   command=lambda: self.arrange_selection(distribute_boxes, 'y')).pack(
+            side=tk.LEFT, fill=tk.X, expand=True)
+
+    def save_scene(self):
+        """Save the scene, with its images embedded, to a .gscene file"""
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".gscene",
+            filetypes=[("Scene files", "*.gscene")],
+            title="Save Scene"
+        )
         if file_path:
             try:
-                # Load the image with Pygame
-                img = pygame.image.load(file_path)
-                
-                # Create object data
-                new_obj = {
-                    'x': 100,
-                    'y': 100,
-                    'width': 50,
-                    'height': 50,
-                    'image': img,
-                    'path': file_path,
-                    'rect': pygame.Rect(100, 100, 50, 50),
-                    'name': os.path.basename(file_path)
-                }
-                
-                self.objects.append(new_obj)
-                # Update objects list
-                self.update_object_list()
-                
-                # Select the new object
-                self.selected_object = new_obj
-                self.selected_index = len(self.objects) - 1
-                self.obj_listbox.selection_clear(0, tk.END)
-                self.obj_listbox.selection_set(self.selected_index)
-                
-                self.update_property_display()
-                self.update_preview()
+                SceneFile.save(file_path, self.objects, self.assets, self.tilemap)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to save scene: {e}")
+
+    def open_scene(self):
+        """Replace the current scene with one loaded from a .gscene file"""
+        file_path = filedialog.askopenfilename(
+            filetypes=[("Scene files", "*.gscene")],
+            title="Open Scene"
+        )
+        if file_path:
+            try:
+                self.load_scene_file(file_path)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to open scene: {e}")
+
+    def load_scene_file(self, file_path):
+        """Load a scene file; images are decoded only once they are drawn"""
+        scene = SceneFile(file_path)
+        self.clear_scene()
+        self._scene_file = scene
+        
+        assets = [None] * len(scene.assets)
+        for i in range(scene.count):
+            index = scene.asset[i]
+            if assets[index] is None:
+                path = scene.assets[index][0]
+                assets[index] = self.assets.acquire(path, reader=scene.reader(index))
+            else:
+                self.assets.acquire(scene.assets[index][0])
+            obj = SceneObject(scene.x[i], scene.y[i], scene.width[i], scene.height[i],
+                              assets[index], scene.assets[index][0], scene.names[i],
+                              bool(scene.flags[i] & SceneFile.FLAG_DYNAMIC))
+            self.add_object(obj)
+        
+        if scene.tilemap is not None:
+            layer = scene.tilemap
+            index = layer['tileset']
+            path = scene.assets[index][0]
+            reader = scene.reader(index) if assets[index] is None else None
+            self.set_tilemap(TileMap(self.assets.acquire(path, reader=reader), path,
+                                     layer['tile_size'], layer['columns'], layer['rows'],
+                                     layer['chunk_size'], layer['tiles']))
+        
+        self.update_object_list()
+        self.clear_properties()
+        self._view = None  # force the visible set to be re-queried
+        self.invalidate()
+
+    def add_object(self, obj):
+        """Put an object on top of the scene and index it
+
+        The caller owns the object's asset reference and the listbox row.
+        """
+        self.objects.append(obj)
+        self.spatial.insert(obj)
+        self.grow_extent(obj)
+        self.mark_dirty(obj)
+
+    def clear_scene(self):
+        """Remove every object and release the assets they hold"""
+        self.cancel_import()
+        for obj in self.objects:
+            self.delete_object_items(obj)
+            self.assets.release(obj.asset)
+        self.objects.clear()
+        self.set_tilemap(None)
+        self.spatial.clear()
+        self._dirty.clear()
+        self._visible.clear()
+        self.sprite_cache.invalidate()
+        self.selection = set()
+        self.selected_object = None
+        self.selected_index = None
+        self.selection_label.configure(text="Nothing selected")
+        self.obj_listbox.delete(0, tk.END)
+        if self._scene_file is not None:
+            self._scene_file.close()
+            self._scene_file = None
+
+    def new_tile_layer(self):
+        """Replace the tile layer with an empty one cut from a tileset image"""
+        path = filedialog.askopenfilename(title="Choose Tileset", filetypes=IMAGE_FILETYPES)
+        if not path:
+            return
+        tile_size = simpledialog.askinteger("New Tile Layer", "Tile size (pixels):",
+                                            initialvalue=32, minvalue=1, maxvalue=1024,
+                                            parent=self.master)
+        if tile_size is None:
+            return
+        columns = simpledialog.askinteger("New Tile Layer", "Width (tiles):",
+                                          initialvalue=100, minvalue=1, maxvalue=65535,
+                                          parent=self.master)
+        if columns is None:
+            return
+        rows = simpledialog.askinteger("New Tile Layer", "Height (tiles):",
+                                       initialvalue=100, minvalue=1, maxvalue=65535,
+                                       parent=self.master)
+        if rows is None:
+            return
+        
+        try:
+            asset_id = self.assets.acquire(path)
+        except (pygame.error, IOError) as e:
+            messagebox.showerror("Error", f"Could not load image: {e}")
+            return
+        self.set_tilemap(TileMap(asset_id, path, tile_size, columns, rows))
+        self.tile_paint.set(True)
+
+    def set_tilemap(self, tilemap):
+        """Replace the tile layer (None removes it); takes over its asset reference"""
+        if self.tilemap is not None:
+            self.assets.release(self.tilemap.asset)
+        for entry in self._tile_items.values():
+            self.canvas.delete(entry[0])
+        self._tile_items.clear()
+        self.tilemap = tilemap
+        if tilemap is not None:
+            self.grow_extent(tilemap)
+        self.invalidate()
+
+    def painting_tiles(self):
+        return self.tilemap is not None and self.tile_paint.get()
+
+    def paint_tile(self, event, index=None):
+        """Set the tile under the pointer; only its chunk gets re-baked"""
+        if not self.painting_tiles():
+            return
+        if index is None:
+            try:
+                index = self.tile_index.get()
+            except tk.TclError:
+                return  # Spinbox holds something that isn't a number
+            if not 0 <= index <= TileMap.MAX_INDEX:
+                return  # Typed past the Spinbox's range
+        x, y = self.window_to_world(event.x, event.y)
+        ts = self.tilemap.tile_size
+        if self.tilemap.set(x // ts, y // ts, index):
+            self.scheduler.request()
+
+    def add_sprite(self):
+        file_paths = filedialog.askopenfilenames(filetypes=IMAGE_FILETYPES)
+        if file_paths:
+            self.import_files(file_paths)
+
+    def import_folder(self):
+        """Import every image in a folder as a new sprite"""
+        folder = filedialog.askdirectory(title="Import Folder")
+        if not folder:
+            return
+        paths = sorted(
+            os.path.join(folder, name) for name in os.listdir(folder)
+            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+        )
+        if paths:
+            self.import_files(paths)
+        else:
+            messagebox.showinfo("Import Folder", "No images found in that folder")
+
+    def import_files(self, paths):
+        """Decode images in the background and add them as sprites as they finish"""
+        if self._import_job is not None:
+            messagebox.showwarning("Warning", "An import is already in progress")
+            return
+        
+        self._import_job = ImportJob(paths, known=self.assets)
+        self._import_errors = []
+        self.import_progress.configure(maximum=len(paths), value=0)
+        self.import_frame.pack(after=self._import_anchor, pady=5, padx=10, fill=tk.X)
+        self.poll_import()
+
+    def poll_import(self):
+        """Move finished decodes from the worker queue into the scene"""
+        job = self._import_job
+        if job is None or job.cancelled:
+            return
+        
+        added = []
+        for indices, path, surface, error in job.drain():
+            if error is not None:
+                self._import_errors.append(f"{os.path.basename(path)}: {error}")
+                continue
+            for index in indices:
+                try:
+                    asset_id = self.assets.acquire(path, surface)
+                except (pygame.error, IOError) as e:
+                    self._import_errors.append(f"{os.path.basename(path)}: {e}")
+                    break
                 
-            except (pygame.error, IOError) as e:
-                messagebox.showerror("Error", f"Could not load image: {e}")
+                # Lay multiple sprites out in a grid so they don't all overlap
+                x = 100 + (index % 10) * 60
+                y = 100 + (index // 10) * 60
+                new_obj = SceneObject(x, y, 50, 50, asset_id, path)
+                self.add_object(new_obj)
+                added.append(new_obj)
+        
+        if added:
+            self.obj_listbox.insert(tk.END, *(obj.name for obj in added))
+            
+            # Select the newest object
+            self.set_selection([added[-1]])
+        
+        self.import_progress.configure(value=job.done)
+        if job.finished:
+            self.finish_import()
+        else:
+            self.master.after(30, self.poll_import)
+
+    @property
+    def importing(self):
+        """True while a background import is running"""
+        return self._import_job is not None
+
+    def cancel_import(self):
+        """Stop the running import, keeping the sprites added so far"""
+        if self._import_job is not None:
+            self._import_job.cancel()
+            self.finish_import()
+
+    def finish_import(self):
+        self._import_job = None
+        self.import_frame.pack_forget()
+        if self._import_errors:
+            shown = "\n".join(self._import_errors[:10])
+            if len(self._import_errors) > 10:
+                shown += f"\n... and {len(self._import_errors) - 10} more"
+            messagebox.showerror("Error", f"Could not load image:\n{shown}")
+            self._import_errors = []
 
     def update_object_list(self):
-        """Update the listbox with current objects"""
+        """Rebuild the listbox from scratch (e.g. after loading a scene)
+
+        Day-to-day edits update single rows instead; see rename_object and
+        delete_selected.
+        """
         self.obj_listbox.delete(0, tk.END)
-        for i, obj in enumerate(self.objects):
-            self.obj_listbox.insert(tk.END, f"{i+1}. {obj['name']}")
+        if self.objects:
+            self.obj_listbox.insert(tk.END, *(obj.name for obj in self.objects))
+
+    def set_selection(self, objs, primary=None, sync_list=True):
+        """Replace the selection and refresh the panels and outlines
+
+        primary is shown in the properties panel; by default the topmost
+        selected object.
+        """
+        self.selection = set(objs)
+        if primary not in self.selection:
+            primary = max(self.selection, key=self.spatial.order, default=None)
+        self.selected_object = primary
+        self.selected_index = self.objects.index(primary) if primary is not None else None
+        
+        count = len(self.selection)
+        self.selection_label.configure(
+            text=f"{count} object{'s' if count != 1 else ''} selected" if count else "Nothing selected")
+        if primary is not None:
+            self.update_property_display()
+        else:
+            self.clear_properties()
+        if sync_list:
+            self.sync_list_selection()
+        self.invalidate()
+
+    def sync_list_selection(self):
+        """Mirror the selection in the listbox, one call per run of rows"""
+        self.obj_listbox.selection_clear(0, tk.END)
+        selection = self.selection
+        if selection:
+            indices = [i for i, obj in enumerate(self.objects) if obj in selection]
+            for first, last in index_runs(indices):
+                self.obj_listbox.selection_set(first, last)
+        if self.selected_index is not None:
+            self.obj_listbox.see(self.selected_index)
+
+    def rename_object(self, index, name):
+        """Rename an object and update just its listbox row"""
+        self.objects[index].name = name
+        selected = self.obj_listbox.selection_includes(index)
+        self.obj_listbox.delete(index)
+        self.obj_listbox.insert(index, name)
+        if selected:
+            self.obj_listbox.selection_set(index)
 
     def on_canvas_click(self, event):
         """Handle clicking on the canvas to select objects"""
-        # Get canvas coordinates
-        x, y = event.x, event.y
-        
-        # Check if clicked on any sprite (in reverse order to select top sprites first)
-        for i, obj in reversed(list(enumerate(self.objects))):
-            rect = pygame.Rect(obj['x'], obj['y'], obj['width'], obj['height'])
-            if rect.collidepoint(x, y):
-                self.selected_object = obj
-                self.selected_index = i
-                self.update_property_display()
-                
-                # Update listbox selection
-                self.obj_listbox.selection_clear(0, tk.END)
-                self.obj_listbox.selection_set(i)
-                
-                self.update_preview()
-                return
+        self._marquee = None
+        if self.painting_tiles():
+            self.paint_tile(event)
+            return
         
-        # If clicked nowhere, deselect
-        self.selected_object = None
-        self.selected_index = None
-        self.clear_properties()
-        self.obj_listbox.selection_clear(0, tk.END)
-        self.update_preview()
+        # Convert window coordinates to scene coordinates
+        x, y = self.window_to_world(event.x, event.y)
+        additive = event.state & 0x0001  # Shift
+        
+        # Ask the spatial index for the topmost sprite under the cursor
+        obj = self.spatial.pick(x, y)
+        if obj is not None:
+            if not additive:
+                self.set_selection([obj])
+            elif obj in self.selection:
+                self.set_selection(self.selection - {obj})
+            else:
+                self.set_selection(self.selection | {obj}, obj)
+            return
+        
+        # Empty space: start a marquee; without a drag this just deselects
+        self._marquee = {'start': (x, y), 'additive': additive, 'item': None}
+        if not additive and self.selection:
+            self.set_selection(())
+
+    def on_canvas_drag(self, event):
+        """Stretch the marquee rectangle to the pointer, or keep painting tiles"""
+        marquee = self._marquee
+        if marquee is None:
+            self.paint_tile(event)
+            return
+        x0, y0 = marquee['start']
+        coords = (x0 * self.zoom, y0 * self.zoom,
+                  self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+        if marquee['item'] is None:
+            marquee['item'] = self.canvas.create_rectangle(*coords, outline='#3070ff', dash=(4, 2))
+        else:
+            self.canvas.coords(marquee['item'], *coords)
+
+    def on_canvas_release(self, event):
+        """Select everything the marquee touches"""
+        marquee = self._marquee
+        self._marquee = None
+        if marquee is None or marquee['item'] is None:
+            return
+        self.canvas.delete(marquee['item'])
+        
+        x0, y0 = marquee['start']
+        x1, y1 = self.window_to_world(event.x, event.y)
+        left, right = min(x0, x1), max(x0, x1) + 1
+        top, bottom = min(y0, y1), max(y0, y1) + 1
+        hits = self.spatial.query(left, top, right, bottom)
+        if marquee['additive']:
+            self.set_selection(self.selection.union(hits), self.selected_object)
+        else:
+            self.set_selection(hits)
 
     def update_properties(self):
         """Update the selected object with values from property fields"""
         if self.selected_object is not None and self.selected_index is not None:
             try:
                 # Get new values
+                new_name = self.prop_name.get().strip()
                 new_x = int(self.prop_x.get())
                 new_y = int(self.prop_y.get())
                 new_width = int(self.prop_width.get())
@@ -264,251 +2458,895 @@ class GameEditor:
                     raise ValueError("Width and height must be positive")
                 
                 # Update object
-                self.selected_object['x'] = new_x
-                self.selected_object['y'] = new_y
-                self.selected_object['width'] = new_width
-                self.selected_object['height'] = new_height
-                self.selected_object['rect'] = pygame.Rect(new_x, new_y, new_width, new_height)
+                if new_name and new_name != self.selected_object.name:
+                    self.rename_object(self.selected_index, new_name)
+                self.selected_object.set_geometry(new_x, new_y, new_width, new_height)
+                self.selected_object.dynamic = self.prop_dynamic.get()
+                self.spatial.update(self.selected_object)
+                self.grow_extent(self.selected_object)
                 
                 # Update the preview
-                self.update_preview()
+                self.invalidate(self.selected_object)
                 
             except ValueError as e:
                 messagebox.showerror("Error", f"Invalid values: {e}")
 
     def delete_selected(self):
-        """Delete the currently selected object"""
-        if self.selected_object in self.objects and self.selected_index is not None:
-            # Remove from list
-            del self.objects[self.selected_index]
-            
-            # Clear selection
-            self.selected_object = None
-            self.selected_index = None
-            
-            # Update UI
-            self.update_object_list()
-            self.clear_properties()
-            self.update_preview()
+        """Delete every selected object"""
+        doomed = self.selection
+        if not doomed:
+            return
+        
+        # Remove listbox rows a run at a time, bottom up so indices hold
+        indices = [i for i, obj in enumerate(self.objects) if obj in doomed]
+        for first, last in reversed(index_runs(indices)):
+            self.obj_listbox.delete(first, last)
+        self.objects[:] = [obj for obj in self.objects if obj not in doomed]
+        
+        # Drop their canvas items and asset references
+        for obj in doomed:
+            self.spatial.remove(obj)
+            self.remove_from_preview(obj)
+            self.assets.release(obj.asset)
+        
+        self.set_selection((), sync_list=False)
 
-    def update_preview(self):
-        """Redraw all sprites on the canvas"""
-        # Clear canvas
-        self.canvas.delete("all")
+    def arrange_selection(self, arrange, *args):
+        """Recompute the selection's geometry with a box function
+
+        arrange(boxes, *args) gets every selected (x, y, width, height) and
+        returns the new boxes; they are written back in one pass with a
+        single redraw.
+        """
+        if not self.selection:
+            return
+        objs = list(self.selection)
+        boxes = arrange([(obj.x, obj.y, obj.width, obj.height) for obj in objs], *args)
+        self.apply_geometry(objs, boxes)
+
+    def apply_geometry(self, objs, boxes):
+        """Set (x, y, width, height) for many objects, then redraw once"""
+        spatial = self.spatial
+        for obj, box in zip(objs, boxes):
+            if box != (obj.x, obj.y, obj.width, obj.height):
+                obj.set_geometry(*box)
+                spatial.update(obj)
+                self.grow_extent(obj)
+                self.mark_dirty(obj)
+        if self.selected_object is not None:
+            self.update_property_display()
+        self.invalidate()
+
+    def move_selection(self):
+        try:
+            dx = int(self.move_dx.get())
+            dy = int(self.move_dy.get())
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid values: {e}")
+            return
+        self.arrange_selection(move_boxes, dx, dy)
+
+    def scale_selection(self):
+        try:
+            percent = float(self.scale_percent.get())
+            if percent <= 0:
+                raise ValueError("Scale must be positive")
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid values: {e}")
+            return
+        self.arrange_selection(scale_boxes, percent / 100)
+
+    def snap_selection(self):
+        try:
+            grid = int(self.snap_size.get())
+            if grid <= 0:
+                raise ValueError("Grid size must be positive")
+        except ValueError as e:
+            messagebox.showerror("Error", f"Invalid values: {e}")
+            return
+        self.arrange_selection(snap_boxes, grid)
+
+    def mark_dirty(self, obj):
+        """Queue an object for redraw on the next preview pass"""
+        self._dirty[id(obj)] = obj
+
+    def invalidate(self, obj=None):
+        """Mark an object dirty (if given) and request a preview redraw"""
+        if obj is not None:
+            self.mark_dirty(obj)
+        self.scheduler.request()
+
+    def reset_preview(self):
+        """Drop every canvas item and cached bitmap so the next pass rebuilds
+        the whole preview from the decoded images"""
+        self.sprite_cache.invalidate()
+        for obj in self.objects:
+            self.remove_from_preview(obj)
+            self.mark_dirty(obj)
+        for entry in self._tile_items.values():
+            self.canvas.delete(entry[0])
+        self._tile_items.clear()
+        if self.tilemap is not None:
+            self.tilemap.invalidate()
+        self._view = None
+        self.scheduler.request()
+
+    def remove_from_preview(self, obj):
+        """Delete the canvas items owned by an object"""
+        self._dirty.pop(id(obj), None)
+        self._visible.discard(obj)
+        self.delete_object_items(obj)
+        obj.tk_img = None
+        obj.tk_size = None
+
+    def delete_object_items(self, obj):
+        """Delete an object's canvas items, keeping its cached bitmap"""
+        for item in (obj.item, obj.label_item):
+            if item is not None:
+                self.canvas.delete(item)
+        obj.item = None
+        obj.label_item = None
+        obj.item_kind = None
+
+    def on_view_changed(self):
+        """Schedule a pass to cull/reveal objects after the view moved"""
+        self.scheduler.request()
+
+    def on_mouse_wheel(self, event):
+        """Scroll with the wheel (Shift for horizontal), zoom with Ctrl"""
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            direction = -1
+        else:
+            direction = 1
         
-        # Draw all objects
-        for i, obj in enumerate(self.objects):
-            # Draw the image
-            try:
-                # Scale image for canvas
-                img_surface = pygame.transform.scale(obj['image'], (obj['width'], obj['height']))
-                img_data = pygame.image.tostring(img_surface, 'RGBA')
-                
-                # Create PhotoImage from raw data
-                from PIL import Image, ImageTk
-                pil_img = Image.frombytes('RGBA', (obj['width'], obj['height']), img_data)
-                tk_img = ImageTk.PhotoImage(pil_img)
-                
-                # Keep reference to prevent garbage collection
-                obj['tk_img'] = tk_img
-                
-                # Draw image on canvas
-                self.canvas.create_image(obj['x'], obj['y'], image=tk_img, anchor='nw', tags=f"obj{i}")
-                
-                # Draw selection rectangle if selected
-                if obj == self.selected_object:
-                    self.canvas.create_rectangle(
-                        obj['x'], obj['y'],
-                        obj['x'] + obj['width'], obj['y'] + obj['height'],
-                        outline='red', width=2, tags=f"sel{i}"
-                    )
-            except (pygame.error, IOError, AttributeError) as e:
-                # Draw placeholder if image can't be rendered
-                self.canvas.create_rectangle(
-                    obj['x'], obj['y'],
-                    obj['x'] + obj['width'], obj['y'] + obj['height'],
-                    fill='gray', tags=f"obj{i}"
+        if event.state & 0x0004:  # Control
+            factor = 1.25 if direction < 0 else 0.8
+            self.set_zoom(self.zoom * factor, event.x, event.y)
+        elif event.state & 0x0001:  # Shift
+            self.canvas.xview_scroll(direction, 'units')
+        else:
+            self.canvas.yview_scroll(direction, 'units')
+
+    def set_zoom(self, zoom, anchor_x=None, anchor_y=None):
+        """Change the zoom level, keeping the scene point under the anchor still"""
+        zoom = min(8.0, max(0.05, zoom))
+        if zoom == self.zoom:
+            return
+        if anchor_x is None:
+            anchor_x = self.canvas.winfo_width() // 2
+            anchor_y = self.canvas.winfo_height() // 2
+        world_x = self.canvas.canvasx(anchor_x) / self.zoom
+        world_y = self.canvas.canvasy(anchor_y) / self.zoom
+        
+        self.zoom = zoom
+        self.update_scrollregion()
+        self.scroll_canvas_to(world_x * zoom - anchor_x, world_y * zoom - anchor_y)
+        self.invalidate()
+
+    def scroll_canvas_to(self, canvas_x, canvas_y):
+        """Scroll so the given canvas coordinate is at the top-left corner"""
+        self.update_scrollregion()
+        left, top, right, bottom = self._scrollregion
+        self.canvas.xview_moveto((canvas_x - left) / max(1, right - left))
+        self.canvas.yview_moveto((canvas_y - top) / max(1, bottom - top))
+
+    def see_object(self, obj):
+        """Centre the view on an object if it is currently off screen"""
+        left, top, right, bottom = self.visible_bounds()
+        if obj.x < right and obj.x + obj.width > left and obj.y < bottom and obj.y + obj.height > top:
+            return
+        z = self.zoom
+        self.scroll_canvas_to(
+            (obj.x + obj.width / 2) * z - self.canvas.winfo_width() / 2,
+            (obj.y + obj.height / 2) * z - self.canvas.winfo_height() / 2,
+        )
+
+    def window_to_world(self, x, y):
+        """Convert canvas widget coordinates to scene coordinates"""
+        return (math.floor(self.canvas.canvasx(x) / self.zoom),
+                math.floor(self.canvas.canvasy(y) / self.zoom))
+
+    def visible_bounds(self):
+        """Return the scene rectangle currently shown in the viewport"""
+        z = self.zoom
+        left = self.canvas.canvasx(0)
+        top = self.canvas.canvasy(0)
+        # Before the window is mapped winfo_* report 1x1; use the requested size
+        width = max(self.canvas.winfo_width(), int(self.canvas['width']))
+        height = max(self.canvas.winfo_height(), int(self.canvas['height']))
+        return (math.floor(left / z), math.floor(top / z),
+                math.ceil((left + width) / z), math.ceil((top + height) / z))
+
+    def grow_extent(self, obj):
+        """Widen the scrollable scene area to include an object"""
+        extent = self._extent
+        left, top, right, bottom = obj.bounds
+        if left < extent[0] or top < extent[1] or right > extent[2] or bottom > extent[3]:
+            extent[0] = min(extent[0], left)
+            extent[1] = min(extent[1], top)
+            extent[2] = max(extent[2], right)
+            extent[3] = max(extent[3], bottom)
+            self.scheduler.request()
+
+    def update_scrollregion(self):
+        """Size the scroll region to the scene extent at the current zoom"""
+        z = self.zoom
+        margin = 200
+        region = (math.floor(self._extent[0] * z) - margin, math.floor(self._extent[1] * z) - margin,
+                  math.ceil(self._extent[2] * z) + margin, math.ceil(self._extent[3] * z) + margin)
+        if region != self._scrollregion:
+            self._scrollregion = region
+            self.canvas.config(scrollregion=region)
+
+    def make_sprite_image(self, obj, width, height):
+        """Return the Tk bitmap for an object drawn at width x height"""
+        def build(stale):
+            # A miss may mean the file changed on disk; reload the decoded
+            # source too so the new bitmap isn't built from stale pixels.
+            # Objects still showing the stale bitmap pick up the new pixels
+            # when it is updated in place.
+            self.assets.refresh(obj.asset)
+            return self.pixels.to_photo(self.assets.surface(obj.asset), width, height,
+                                        opaque=self.assets.opaque(obj.asset), photo=stale)
+        return self.sprite_cache.get(obj.path, width, height, build)
+
+    def make_chunk_image(self, key, width, height, photo=None):
+        """Return the Tk bitmap for a tile chunk drawn at width x height"""
+        tilemap = self.tilemap
+        if self.assets.refresh(tilemap.asset):
+            tilemap.invalidate()
+        surface = tilemap.chunk_surface(key, self.assets.surface(tilemap.asset),
+                                        tilemap.level_for(self.zoom))
+        return self.pixels.to_photo(surface, width, height, photo=photo)
+
+    def render_object(self, obj):
+        """Create or update the canvas items for a single object
+
+        Returns True if new canvas items were created.
+        """
+        z = self.zoom
+        x, y = obj.x * z, obj.y * z
+        w, h = max(1, round(obj.width * z)), max(1, round(obj.height * z))
+        
+        rebuilt = False
+        if z < self.lod_zoom:
+            # Zoomed far out: a flat rectangle is indistinguishable and cheap
+            kind = 'lod'
+        else:
+            # Only rebuild the bitmap when the drawn size changed (or on
+            # first draw); a plain move reuses the existing one
+            rebuilt = obj.tk_size != (w, h)
+            if rebuilt:
+                try:
+                    obj.tk_img = self.make_sprite_image(obj, w, h)
+                except (pygame.error, IOError, AttributeError, ValueError):
+                    obj.tk_img = None
+                obj.tk_size = (w, h)
+            kind = 'image' if obj.tk_img is not None else 'error'
+        
+        with self.profiler.stage('canvas'):
+            return self.place_items(obj, kind, x, y, w, h, rebuilt)
+
+    def place_items(self, obj, kind, x, y, w, h, rebuilt):
+        """Create, convert or move an object's canvas items
+
+        Returns True if new canvas items were created.
+        """
+        old_items = None
+        if obj.item is not None and obj.item_kind != kind:
+            # Switching representation: build the new items first so they
+            # can take over the old ones' stacking position
+            old_items = (obj.item, obj.label_item)
+            obj.item = obj.label_item = None
+        
+        if obj.item is None:
+            if kind == 'image':
+                obj.item = self.canvas.create_image(x, y, image=obj.tk_img, anchor='nw')
+            elif kind == 'lod':
+                obj.item = self.canvas.create_rectangle(
+                    x, y, x + w, y + h, fill='#c8c8c8', outline='#909090'
                 )
-                self.canvas.create_text(
-                    obj['x'] + obj['width']//2, obj['y'] + obj['height']//2,
-                    text="Image Error", fill="white", tags=f"err{i}"
+            else:
+                # Draw placeholder if image can't be rendered
+                obj.item = self.canvas.create_rectangle(x, y, x + w, y + h, fill='gray')
+                obj.label_item = self.canvas.create_text(
+                    x + w//2, y + h//2, text="Image Error", fill="white"
                 )
+            obj.item_kind = kind
+            if old_items is not None:
+                self.canvas.tag_lower(obj.item, old_items[0])
+                if obj.label_item is not None:
+                    self.canvas.tag_raise(obj.label_item, obj.item)
+                for item in old_items:
+                    if item is not None:
+                        self.canvas.delete(item)
+                return False
+            return True
+        
+        if kind == 'image':
+            self.canvas.coords(obj.item, x, y)
+            if rebuilt:
+                self.canvas.itemconfig(obj.item, image=obj.tk_img)
+        else:
+            self.canvas.coords(obj.item, x, y, x + w, y + h)
+            if obj.label_item is not None:
+                self.canvas.coords(obj.label_item, x + w//2, y + h//2)
+        return False
+
+    def restack_visible(self):
+        """Put the visible objects' canvas items back into scene z-order"""
+        for obj in sorted(self._visible, key=self.spatial.order):
+            self.canvas.tag_raise(obj.item)
+            if obj.label_item is not None:
+                self.canvas.tag_raise(obj.label_item)
+
+    def update_selection_outline(self):
+        """Outline the selected objects that are on screen
+
+        Only visible selected objects get an outline item, so selecting
+        thousands of objects costs no more than what fits in the view.
+        """
+        items = self._selection_items
+        shown = self.selection & self._visible
+        for obj in [obj for obj in items if obj not in shown]:
+            self.canvas.delete(items.pop(obj)[0])
+        
+        z = self.zoom
+        raise_items = self._raise_selection
+        for obj in shown:
+            coords = tuple(v * z for v in obj.bounds)
+            primary = obj is self.selected_object
+            entry = items.get(obj)
+            if entry is None:
+                item = self.canvas.create_rectangle(*coords, tags='selection')
+                entry = items[obj] = [item, coords, None]
+                raise_items = True
+            elif entry[1] != coords:
+                self.canvas.coords(entry[0], *coords)
+                entry[1] = coords
+            if entry[2] != primary:
+                self.canvas.itemconfig(entry[0], outline='red' if primary else '#ff9040',
+                                       width=2 if primary else 1)
+                entry[2] = primary
+        
+        if raise_items and items:
+            self.canvas.tag_raise('selection')
+        self._raise_selection = False
+
+    def update_preview(self):
+        """Redraw the visible objects that changed since the last pass"""
+        profiler = self.profiler
+        profiler.begin_frame()
+        with profiler.stage('cull'):
+            to_render = self.update_visible_set()
+        if self.tilemap is not None:
+            with profiler.stage('tiles'):
+                self.update_tile_chunks()
+        
+        # Render bottom-up so freshly created items stack correctly among
+        # themselves; restack only if one landed above an older, higher item
+        created = []
+        for obj in sorted(to_render, key=self.spatial.order):
+            if self.render_object(obj):
+                created.append(obj)
+        if created:
+            lowest_new = self.spatial.order(created[0])
+            created_set = set(created)
+            if any(self.spatial.order(obj) > lowest_new
+                   for obj in self._visible if obj not in created_set):
+                with profiler.stage('canvas'):
+                    self.restack_visible()
+            # Newly created items land on top; keep the outlines above them
+            self._raise_selection = True
+        self.update_selection_outline()
+        profiler.end_frame()
+        
+        if profiler.enabled:
+            self.update_status_bar()
+        if self._profile_capture is not None:
+            self._profile_capture['frames'] -= 1
+            if self._profile_capture['frames'] <= 0:
+                self.finish_profile_capture()
+
+    def update_tile_chunks(self):
+        """Show the tile layer's chunks that are in view
+
+        Each chunk is one canvas image below all sprites. Its bitmap is only
+        rebuilt when the chunk was edited or the zoom changed its size, and
+        chunks that scroll out of view lose their items.
+        """
+        tilemap = self.tilemap
+        items = self._tile_items
+        visible = set(tilemap.chunks_in(*self.visible_bounds()))
+        for key in [key for key in items if key not in visible]:
+            self.canvas.delete(items.pop(key)[0])
+        
+        changed = tilemap.changed
+        tilemap.changed = set()
+        z = self.zoom
+        for key in visible:
+            left, top, right, bottom = tilemap.chunk_bounds(key)
+            size = (max(1, round((right - left) * z)), max(1, round((bottom - top) * z)))
+            entry = items.get(key)
+            if entry is not None and entry[2] == size and key not in changed:
+                continue
+            try:
+                # An edited chunk at the same size is repainted in place
+                photo = self.make_chunk_image(key, *size, photo=entry[1] if entry else None)
+            except (pygame.error, IOError, ValueError):
+                continue
+            if entry is None:
+                item = self.canvas.create_image(left * z, top * z, image=photo,
+                                                anchor='nw', tags='tiles')
+                self.canvas.tag_lower(item)
+                items[key] = [item, photo, size]
+            elif photo is not entry[1]:
+                self.canvas.coords(entry[0], left * z, top * z)
+                self.canvas.itemconfig(entry[0], image=photo)
+                entry[1] = photo
+                entry[2] = size
+
+    def update_visible_set(self):
+        """Sync the visible set with the view; return the objects to render"""
+        self.update_scrollregion()
+        view = self.visible_bounds()
+        left, top, right, bottom = view
+        dirty = self._dirty
+        self._dirty = {}
         
-        # Schedule next update
-        self.master.after(100, self.update_preview)
+        if (view, self.zoom) != self._view:
+            # The view moved or zoomed: re-query what is on screen, drop
+            # items that scrolled out and create the ones that scrolled in
+            zoomed = self._view is None or self._view[1] != self.zoom
+            self._view = (view, self.zoom)
+            visible = set(self.spatial.query(left, top, right, bottom))
+            for obj in self._visible - visible:
+                self.delete_object_items(obj)
+            if zoomed:
+                to_render = set(visible)
+            else:
+                to_render = visible - self._visible
+                to_render.update(obj for obj in dirty.values() if obj in visible)
+            self._visible = visible
+        else:
+            # Same view: only dirty objects can have entered or left it
+            to_render = set()
+            for obj in dirty.values():
+                if obj.x < right and obj.x + obj.width > left and obj.y < bottom and obj.y + obj.height > top:
+                    self._visible.add(obj)
+                    to_render.add(obj)
+                elif obj in self._visible:
+                    self._visible.discard(obj)
+                    self.delete_object_items(obj)
+        return to_render
 
     def export_python(self):
         """Export the game to a Python script"""
-        if not self.objects:
+        self.run_export("Export to Python", [])
+
+    def run_export(self, title, targets):
+        """Ask for the script path, prepare one build and hand it to targets
+
+        Each target is called as target(file_path, data_files) after the
+        shared Python build is written; returns the file path, or None if
+        nothing was exported.
+        """
+        if not self.objects and self.tilemap is None:
             messagebox.showwarning("Warning", "No objects to export")
-            return
+            return None
             
         file_path = filedialog.asksaveasfilename(
             defaultextension=".py",
             filetypes=[("Python files", "*.py")],
-            title="Export to Python"
+            title=title
         )
         
-        if file_path:
-            try:
-                with open(file_path, 'w') as f:
-                    f.write("import pygame\nimport os\nimport sys\n\n")
-                    f.write("def resource_path(relative_path):\n")
-                    f.write("    \"\"\"Get absolute path to resource, works for dev and for PyInstaller\"\"\"\n")
-                    f.write("    try:\n")
-                    f.write("        # PyInstaller creates a temp folder and stores path in _MEIPASS\n")
-                    f.write("        base_path = sys._MEIPASS\n")
-                    f.write("    except Exception:\n")
-                    f.write("        base_path = os.path.abspath('.')\n")
-                    f.write("    return os.path.join(base_path, relative_path)\n\n")
-                    
-                    f.write("def main():\n")
-                    f.write("    pygame.init()\n")
-                    f.write("    screen = pygame.display.set_mode((600, 400))\n")
-                    f.write("    pygame.display.set_caption('My Game')\n")
-                    f.write("    clock = pygame.time.Clock()\n")
-                    f.write("    running = True\n\n")
-                    
-                    # Load game objects
-                    f.write("    # Load game objects\n")
-                    for i, obj in enumerate(self.objects):
-                        img_filename = os.path.basename(obj['path'])
-                        f.write(f"    img_path{i} = resource_path('{img_filename}')\n")
-                        f.write(f"    obj{i}_img = pygame.image.load(img_path{i}).convert_alpha()\n")
-                        f.write(f"    obj{i}_img = pygame.transform.scale(obj{i}_img, ({obj['width']}, {obj['height']}))\n")
-                        f.write(f"    obj{i}_rect = pygame.Rect({obj['x']}, {obj['y']}, {obj['width']}, {obj['height']})\n\n")
-                    
-                    # Game loop
-                    f.write("    # Game loop\n")
-                    f.write("    while running:\n")
-                    f.write("        # Handle events\n")
-                    f.write("        for event in pygame.event.get():\n")
-                    f.write("            if event.type == pygame.QUIT:\n")
-                    f.write("                running = False\n\n")
-                    
-                    f.write("        # Draw everything\n")
-                    f.write("        screen.fill((255, 255, 255))\n")
-                    
-                    for i in range(len(self.objects)):
-                        f.write(f"        screen.blit(obj{i}_img, obj{i}_rect)\n")
-                    
-                    f.write("\n        pygame.display.flip()\n")
-                    f.write("        clock.tick(60)\n\n")
-                    
-                    f.write("    pygame.quit()\n\n")
-                    f.write("if __name__ == '__main__':\n")
-                    f.write("    main()\n")
-                
-                # Copy image files to the same directory
-                export_dir = os.path.dirname(file_path)
-                for obj in self.objects:
-                    dest_path = os.path.join(export_dir, os.path.basename(obj['path']))
-                    if dest_path != obj['path']:  # Don't copy if already there
-                        import shutil
-                        shutil.copy2(obj['path'], dest_path)
-                
-                messagebox.showinfo("Success", f"Game exported to {file_path}")
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to export: {e}")
+        if not file_path:
+            return None  # User cancelled
+        
+        try:
+            data_files = self.write_python_export(file_path)
+            for target in targets:
+                target(file_path, data_files)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to export: {e}")
+            return None
+        
+        if not targets:
+            stats = self.export_stats
+            messagebox.showinfo(
+                "Success",
+                f"Game exported to {file_path}\n\n"
+                f"{stats['copied']} image files written, {stats['reused']} unchanged"
+            )
+        return file_path
 
-    def export_dmg(self):
-        """Export as macOS application bundle and DMG"""
-        # Check if we're on macOS
-        if platform.system() != 'Darwin':
-            messagebox.showerror("Error", "DMG export is only supported on macOS")
-            return
-            
-        if not self.objects:
-            messagebox.showwarning("Warning", "No objects to export")
-            return
+    def write_python_export(self, file_path):
+        """Write the game and its images; return the data file names
+
+        Assets go through the export directory's build cache, so only new
+        or changed images are written.
+        """
+        export_dir = os.path.dirname(file_path)
+        cache = ExportCache(export_dir)
+        if self.export_atlas.get():
+            atlas_files, sprite_rects, sprite_of = self.write_atlases(export_dir, cache)
+            data_files = list(atlas_files)
+            sprites = {'atlases': atlas_files, 'sprites': sprite_rects}
+        else:
+            data_files, name_of = self.copy_images(export_dir, cache)
+            image_index = {name: i for i, name in enumerate(data_files)}
+            sprite_ids = {}
+            sprite_of = []
+            for obj in self.objects:
+                key = (image_index[name_of[obj.asset]], obj.width, obj.height)
+                sprite_of.append(sprite_ids.setdefault(key, len(sprite_ids)))
+            sprites = {'images': list(data_files), 'sprites': list(sprite_ids)}
         
-        # First, create Python file
-        py_path = filedialog.asksaveasfilename(
-            defaultextension=".py",
-            filetypes=[("Python files", "*.py")],
-            title="Save Python File for DMG Export"
-        )
+        tiles = None
+        if self.tilemap is not None:
+            # The tileset ships as its own image, never packed into an atlas
+            tile_files, _ = self.copy_images(export_dir, cache, [self.tilemap.asset])
+            tiles = self.tilemap.export_data(tile_files[0])
+            data_files.extend(name for name in tile_files if name not in data_files)
+        
+        outputs = list(data_files)
+        if self.export_data.get():
+            scene_file = self.write_scene_data(file_path, sprites, sprite_of, tiles)
+            data_files.append(scene_file)
+            outputs += [scene_file, RUNTIME_MODULE + '.py']
+        else:
+            self.write_script(file_path, sprites, sprite_of, tiles)
+        # Prune only once the new build is complete on disk
+        cache.finish(file_path, outputs)
+        self.export_stats = {'copied': cache.copied, 'reused': cache.reused}
+        return data_files
+
+    def copy_images(self, export_dir, cache, asset_ids=None):
+        """Copy new or changed source images into the export
+
+        Copies the objects' images unless asset_ids are given. Files are
+        hashed and copied on a thread pool and named by content. Returns
+        (file names, {asset id: file name}).
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        if asset_ids is None:
+            asset_ids = list(dict.fromkeys(obj.asset for obj in self.objects))
+        
+        def prepare(asset_id):
+            path = self.assets.path(asset_id)
+            # Source moved away since the scene was saved; use the copy
+            # embedded in the scene file
+            fallback = lambda: self.assets.source_bytes(asset_id)
+            return path, fallback, cache.output_name(path, cache.digest(path, fallback))
+        
+        with ThreadPoolExecutor(max_workers=min(8, (os.cpu_count() or 1) + 1)) as pool:
+            prepared = list(pool.map(prepare, asset_ids))
+            name_of = {}
+            pending = {}
+            for asset_id, (path, fallback, name) in zip(asset_ids, prepared):
+                name_of[asset_id] = name
+                # Identical content under different paths is stored once
+                if name not in pending and not cache.exists(name):
+                    pending[name] = pool.submit(cache.store, name, path, fallback)
+            for future in pending.values():
+                future.result()
         
-        if not py_path:
-            return  # User cancelled
+        data_files = list(dict.fromkeys(name_of.values()))
+        cache.copied += len(pending)
+        cache.reused += len(data_files) - len(pending)
+        return data_files, name_of
+
+    def write_scene_data(self, file_path, sprites, sprite_of, tiles=None):
+        """Write the scene data file, runtime module and launcher
+
+        Returns the scene file name.
+        """
+        export_dir = os.path.dirname(file_path)
+        scene_file = os.path.splitext(os.path.basename(file_path))[0] + '.scene.json'
+        
+        flat = []
+        for obj, sprite in zip(self.objects, sprite_of):
+            flat.extend((sprite, obj.x, obj.y))
+        data = {
+            'version': 1,
+            'size': [600, 400],
+            'background': [255, 255, 255],
+            'objects': flat,
+            'dynamic': [i for i, obj in enumerate(self.objects) if obj.dynamic],
+        }
+        data.update(sprites)
+        if tiles is not None:
+            data['tilemap'] = tiles
+        write_if_changed(os.path.join(export_dir, scene_file),
+                         json.dumps(data, separators=(',', ':')))
+        write_if_changed(os.path.join(export_dir, RUNTIME_MODULE + '.py'), RUNTIME_SOURCE)
+        write_if_changed(file_path,
+                         f"import {RUNTIME_MODULE}\n\n"
+                         "if __name__ == '__main__':\n"
+                         f"    {RUNTIME_MODULE}.run({scene_file!r})\n")
+        return scene_file
+
+    def write_script(self, file_path, sprites, sprite_of, tiles=None):
+        """Write the self-contained script with per-object load and draw code"""
+        use_atlas = 'atlases' in sprites
+        
+        with io.StringIO() as f:
+            f.write("import json\nimport math\nimport os\nimport sys\nimport time\n")
+            if tiles is not None:
+                f.write("import base64\nfrom array import array\n")
+            f.write("\n# Keep stdout clean for --benchmark reports\n")
+            f.write("os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')\n")
+            f.write("import pygame\n\n")
+            f.write("def resource_path(relative_path):\n")
+            f.write("    \"\"\"Get absolute path to resource, works for dev and for PyInstaller\"\"\"\n")
+            f.write("    try:\n")
+            f.write("        # PyInstaller creates a temp folder and stores path in _MEIPASS\n")
+            f.write("        base_path = sys._MEIPASS\n")
+            f.write("    except Exception:\n")
+            f.write("        base_path = os.path.abspath('.')\n")
+            f.write("    return os.path.join(base_path, relative_path)\n\n")
             
-        try:
-            # Export Python file first
-            self.export_python()
+            if use_atlas:
+                # (atlas index, x, y, width, height) for every distinct scaled sprite
+                f.write(f"ATLAS_FILES = {sprites['atlases']!r}\n")
+                f.write(f"SPRITE_RECTS = {sprites['sprites']!r}\n\n")
             
-            # Create setup.py for py2app
-            setup_path = os.path.join(os.path.dirname(py_path), "setup.py")
-            with open(setup_path, 'w') as f:
-                f.write("from setuptools import setup\n\n")
-                f.write(f"APP = ['{os.path.basename(py_path)}']\n")
-                f.write("DATA_FILES = [\n")
-                
-                # Add all image files
-                for obj in self.objects:
-                    f.write(f"    '{os.path.basename(obj['path'])}',\n")
-                
-                f.write("]\n\n")
-                f.write("OPTIONS = {\n")
-                f.write("    'argv_emulation': True,\n")
-                f.write("    'packages': ['pygame'],\n")
-                f.write("    'excludes': ['numpy', 'scipy', 'matplotlib'],\n")  # Reduce size
-                f.write("    'plist': {\n")
-                f.write("        'CFBundleName': 'My Game',\n")
-                f.write("        'CFBundleDisplayName': 'My Game',\n")
-                f.write("        'CFBundleIdentifier': 'com.mygame.app',\n")
-                f.write("        'CFBundleVersion': '1.0.0',\n")
-                f.write("        'CFBundleShortVersionString': '1.0.0'\n")
-                f.write("    }\n")
-                f.write("}\n\n")
-                f.write("setup(\n")
-                f.write("    app=APP,\n")
-                f.write("    data_files=DATA_FILES,\n")
-                f.write("    options={'py2app': OPTIONS},\n")
-                f.write("    setup_requires=['py2app'],\n")
-                f.write(")\n")
+            if tiles is not None:
+                f.write(TILE_LAYER_SOURCE.lstrip("\n") + "\n\n")
+                f.write(f"TILE_DATA = {tiles!r}\n\n")
             
-            # Create build script
-            build_script = os.path.join(os.path.dirname(py_path), "build_dmg.sh")
-            dmg_path = py_path.replace('.py', '.dmg')
+            # --benchmark, --fixed-step and friends, as in the runtime module
+            f.write(PACING_SOURCE.lstrip("\n") + "\n\n")
+            f.write("def update(dt):\n")
+            f.write("    \"\"\"Game logic: called every frame, or once per step with --fixed-step\"\"\"\n")
+            f.write("    pass\n\n")
             
-            with open(build_script, 'w') as f:
-                f.write("#!/bin/bash\n\n")
-                f.write(f"cd '{os.path.dirname(py_path)}'\n\n")
-                f.write("echo 'Cleaning previous builds...'\n")
-                f.write("rm -rf build dist\n\n")
-                f.write("echo 'Building application with py2app...'\n")
-                f.write("python3 setup.py py2app -A\n\n")  # -A for alias mode (faster development)
-                f.write("echo 'Creating DMG file...'\n")
-                f.write(f"hdiutil create -volname 'My Game' -srcfolder dist/*.app -ov -format UDZO '{dmg_path}'\n\n")
-                f.write("echo 'Done! DMG created at {dmg_path}'\n")
+            f.write("def main(argv=None):\n")
+            f.write("    options = parse_args(argv)\n")
+            f.write("    load_start = time.perf_counter()\n")
+            f.write("    pygame.init()\n")
+            f.write("    screen = pygame.display.set_mode((600, 400))\n")
+            f.write("    pygame.display.set_caption('My Game')\n")
+            f.write("    running = True\n\n")
             
-            # Make executable and run
-            os.chmod(build_script, 0o755)
+            if use_atlas:
+                f.write("    # Load the texture atlases once and cut sprites out of them\n")
+                f.write("    atlases = [pygame.image.load(resource_path(name)).convert_alpha() for name in ATLAS_FILES]\n")
+                f.write("    sprites = [atlases[a].subsurface((x, y, w, h)) for a, x, y, w, h in SPRITE_RECTS]\n\n")
             
-            # Show instructions to user
-            messagebox.showinfo(
-                "DMG Export", 
-                f"Setup complete! To build the DMG:\n\n"
-                f"1. Open Terminal\n"
-                f"2. Run: cd '{os.path.dirname(py_path)}'\n"
-                f"3. Run: ./build_dmg.sh\n\n"
-                f"This will create: {dmg_path}"
-            )
+            if tiles is not None:
+                f.write("    # Tile layer; chunks are baked the first time they are drawn\n")
+                f.write("    tileset = pygame.image.load(resource_path(TILE_DATA['tileset'])).convert_alpha()\n")
+                f.write("    tile_layer = TileLayer(TILE_DATA, tileset)\n\n")
             
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to set up DMG export: {e}")
+            # Load game objects
+            f.write("    # Load game objects\n")
+            for i, obj in enumerate(self.objects):
+                if use_atlas:
+                    f.write(f"    obj{i}_img = sprites[{sprite_of[i]}]\n")
+                else:
+                    img_filename = sprites['images'][sprites['sprites'][sprite_of[i]][0]]
+                    f.write(f"    img_path{i} = resource_path('{img_filename}')\n")
+                    f.write(f"    obj{i}_img = pygame.image.load(img_path{i}).convert_alpha()\n")
+                    f.write(f"    obj{i}_img = pygame.transform.scale(obj{i}_img, ({obj.width}, {obj.height}))\n")
+                f.write(f"    obj{i}_rect = pygame.Rect({obj.x}, {obj.y}, {obj.width}, {obj.height})\n\n")
+            
+            # Static objects below the first dynamic one are baked into a
+            # background once; the rest are redrawn over it
+            dynamic = [i for i, obj in enumerate(self.objects) if obj.dynamic]
+            first_dynamic = dynamic[0] if dynamic else len(self.objects)
+            
+            f.write("    # Bake static objects into a cached background\n")
+            f.write("    background = pygame.Surface(screen.get_size()).convert()\n")
+            f.write("    background.fill((255, 255, 255))\n")
+            if tiles is not None:
+                f.write("    tile_layer.draw(background)\n")
+            for i in range(first_dynamic):
+                f.write(f"    background.blit(obj{i}_img, obj{i}_rect)\n")
+            f.write("\n")
+            
+            # Overlay objects that touch a dynamic rectangle are the only
+            # ones that need repainting after the first frame
+            def touches_dynamic(obj):
+                return any(obj.x < d.x + d.width and obj.x + obj.width > d.x and
+                           obj.y < d.y + d.height and obj.y + obj.height > d.y
+                           for d in (self.objects[j] for j in dynamic))
+            overlay = range(first_dynamic, len(self.objects))
+            for func_name, indices in (("draw_overlay", overlay),
+                                       ("draw_dirty_overlay", [i for i in overlay if touches_dynamic(self.objects[i])])):
+                f.write(f"    def {func_name}():\n")
+                for i in indices:
+                    f.write(f"        screen.blit(obj{i}_img, obj{i}_rect)\n")
+                if not indices:
+                    f.write("        pass\n")
+                f.write("\n")
+            
+            f.write("    # Only these rectangles change from frame to frame\n")
+            f.write("    dirty_rects = [" + ", ".join(f"obj{i}_rect" for i in dynamic) + "]\n")
+            f.write("    expose_events = {pygame.VIDEOEXPOSE, getattr(pygame, 'WINDOWEXPOSED', pygame.VIDEOEXPOSE)}\n")
+            f.write("    full_redraw = True\n")
+            f.write("    load_seconds = time.perf_counter() - load_start\n")
+            f.write("    pacer = FramePacer(options.fps, options.fixed_step)\n\n")
+            
+            # Game loop
+            f.write("    # Game loop\n")
+            f.write("    while running:\n")
+            f.write("        dt, steps = pacer.begin()\n\n")
+            f.write("        # Handle events\n")
+            f.write("        for event in pygame.event.get():\n")
+            f.write("            if event.type == pygame.QUIT:\n")
+            f.write("                running = False\n")
+            f.write("            elif event.type in expose_events:\n")
+            f.write("                full_redraw = True\n\n")
+            
+            f.write("        if pacer.step:\n")
+            f.write("            for _ in range(steps):\n")
+            f.write("                update(pacer.step)\n")
+            f.write("        else:\n")
+            f.write("            update(dt)\n\n")
+            
+            f.write("        # Draw everything once, then only the dynamic rectangles\n")
+            f.write("        if full_redraw or options.redraw_all:\n")
+            f.write("            screen.blit(background, (0, 0))\n")
+            f.write("            draw_overlay()\n")
+            f.write("            pygame.display.flip()\n")
+            f.write("            full_redraw = False\n")
+            f.write("        elif dirty_rects:\n")
+            f.write("            # Clip the overlay to each restored rectangle\n")
+            f.write("            for rect in dirty_rects:\n")
+            f.write("                screen.blit(background, rect, rect)\n")
+            f.write("                screen.set_clip(rect)\n")
+            f.write("                draw_dirty_overlay()\n")
+            f.write("            screen.set_clip(None)\n")
+            f.write("            pygame.display.update(dirty_rects)\n")
+            f.write("        pacer.end()\n")
+            f.write("        if options.benchmark and len(pacer.work) >= options.benchmark:\n")
+            f.write("            running = False\n\n")
+            
+            f.write("    video_driver = pygame.display.get_driver()\n")
+            f.write("    pygame.quit()\n")
+            f.write("    if options.benchmark or options.stats:\n")
+            f.write("        write_report(pacer.report(load_ms=round(load_seconds * 1000, 3),\n")
+            f.write(f"                                  objects={len(self.objects)}, video_driver=video_driver),\n")
+            f.write("                     options.output)\n\n")
+            f.write("if __name__ == '__main__':\n")
+            f.write("    main()\n")
+            write_if_changed(file_path, f.getvalue())
+
+    def write_atlases(self, export_dir, cache, prefix='atlas'):
+        """Pack every distinct scaled sprite into atlas images in export_dir
+
+        Returns (atlas file names, sprite rects, sprite index per object),
+        where each rect is (atlas index, x, y, width, height). Atlas names
+        carry a hash of their inputs; when those files already exist the
+        pages aren't composited again.
+        """
+        sprite_ids = {}
+        sprite_keys = []
+        sprite_of = []
+        for obj in self.objects:
+            key = (obj.asset, obj.width, obj.height)
+            if key not in sprite_ids:
+                sprite_ids[key] = len(sprite_keys)
+                sprite_keys.append(key)
+            sprite_of.append(sprite_ids[key])
+        
+        placements, pages = pack_atlas([(w, h) for _, w, h in sprite_keys])
+        sprite_rects = [(page, x, y, w, h)
+                        for (_, w, h), (page, x, y) in zip(sprite_keys, placements)]
+        
+        # The packing is deterministic, so the sources' content and the
+        # sprite sizes fully determine the pages
+        hasher = hashlib.sha1()
+        for asset_id, w, h in sprite_keys:
+            path = self.assets.path(asset_id)
+            digest = cache.digest(path, lambda: self.assets.source_bytes(asset_id))
+            hasher.update(f"{digest}:{w}x{h};".encode('ascii'))
+        key = hasher.hexdigest()[:12]
+        atlas_files = [f"{prefix}-{key}-{i}.png" for i in range(len(pages))]
+        if all(cache.exists(name) for name in atlas_files):
+            cache.reused += len(atlas_files)
+            return atlas_files, sprite_rects, sprite_of
+        
+        atlases = [pygame.Surface(size, pygame.SRCALPHA) for size in pages]
+        for (asset_id, w, h), (page, x, y) in zip(sprite_keys, placements):
+            self.assets.refresh(asset_id)
+            scaled = pygame.transform.scale(self.assets.surface(asset_id), (w, h))
+            if scaled.get_flags() & pygame.SRCALPHA:
+                # Copy RGBA as-is; a normal alpha blit onto the transparent
+                # page would darken semi-transparent edges
+                atlases[page].blit(scaled, (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+            else:
+                atlases[page].blit(scaled, (x, y))
+        
+        for name, atlas in zip(atlas_files, atlases):
+            cache.store_surface(name, atlas)
+        cache.copied += len(atlas_files)
+        return atlas_files, sprite_rects, sprite_of
+
+    def export_dmg(self):
+        """Export as macOS application bundle and DMG"""
+        # Check if we're on macOS
+        if platform.system() != 'Darwin':
+            messagebox.showerror("Error", "DMG export is only supported on macOS")
+            return
+        
+        # The DMG target reuses the Python build rather than exporting twice
+        py_path = self.run_export("Save Python File for DMG Export", [self.write_dmg_project])
+        if py_path is None:
+            return
+        
+        # Show instructions to user
+        dmg_path = py_path.replace('.py', '.dmg')
+        messagebox.showinfo(
+            "DMG Export", 
+            f"Setup complete! To build the DMG:\n\n"
+            f"1. Open Terminal\n"
+            f"2. Run: cd '{os.path.dirname(py_path)}'\n"
+            f"3. Run: ./build_dmg.sh\n\n"
+            f"This will create: {dmg_path}"
+        )
 
+    def write_dmg_project(self, py_path, data_files):
+        """Write setup.py and build_dmg.sh for an exported script"""
+        # Create setup.py for py2app
+        f = io.StringIO()
+        f.write("from setuptools import setup\n\n")
+        f.write(f"APP = ['{os.path.basename(py_path)}']\n")
+        f.write("DATA_FILES = [\n")
+        
+        # Add all image files
+        for name in data_files:
+            f.write(f"    '{name}',\n")
+        
+        f.write("]\n\n")
+        f.write("OPTIONS = {\n")
+        f.write("    'argv_emulation': True,\n")
+        f.write("    'packages': ['pygame'],\n")
+        f.write("    'excludes': ['numpy', 'scipy', 'matplotlib'],\n")  # Reduce size
+        f.write("    'plist': {\n")
+        f.write("        'CFBundleName': 'My Game',\n")
+        f.write("        'CFBundleDisplayName': 'My Game',\n")
+        f.write("        'CFBundleIdentifier': 'com.mygame.app',\n")
+        f.write("        'CFBundleVersion': '1.0.0',\n")
+        f.write("        'CFBundleShortVersionString': '1.0.0'\n")
+        f.write("    }\n")
+        f.write("}\n\n")
+        f.write("setup(\n")
+        f.write("    app=APP,\n")
+        f.write("    data_files=DATA_FILES,\n")
+        f.write("    options={'py2app': OPTIONS},\n")
+        f.write("    setup_requires=['py2app'],\n")
+        f.write(")\n")
+        write_if_changed(os.path.join(os.path.dirname(py_path), "setup.py"), f.getvalue())
+        
+        # Create build script
+        build_script = os.path.join(os.path.dirname(py_path), "build_dmg.sh")
+        dmg_path = py_path.replace('.py', '.dmg')
+        
+        f = io.StringIO()
+        f.write("#!/bin/bash\n\n")
+        f.write(f"cd '{os.path.dirname(py_path)}'\n\n")
+        f.write("echo 'Cleaning previous builds...'\n")
+        f.write("rm -rf build dist\n\n")
+        f.write("echo 'Building application with py2app...'\n")
+        f.write("python3 setup.py py2app -A\n\n")  # -A for alias mode (faster development)
+        f.write("echo 'Creating DMG file...'\n")
+        f.write(f"hdiutil create -volname 'My Game' -srcfolder dist/*.app -ov -format UDZO '{dmg_path}'\n\n")
+        f.write("echo 'Done! DMG created at {dmg_path}'\n")
+        write_if_changed(build_script, f.getvalue())
+        
+        # Make executable
+        os.chmod(build_script, 0o755)
 
 if __name__ == "__main__":
     # Initialize main window
     root = tk.Tk()
     root.title("macOS Game Editor")
     
-    # Check dependencies
-    try:
-        from PIL import Image, ImageTk
-    except ImportError:
+    # Check dependencies (without importing them yet)
+    if Image is None or ImageTk is None:
         messagebox.showerror(
             "Missing Dependency", 
             "This application requires the Pillow library.\n"
@@ -517,9 +3355,7 @@ if __name__ == "__main__":
         root.destroy()
         sys.exit(1)
         
-    try:
-        import pygame
-    except ImportError:
+    if pygame is None:
         messagebox.showerror(
             "Missing Dependency", 
             "This application requires Pygame.\n"
@@ -530,4 +3366,18 @@ if __name__ == "__main__":
     
     # Start application
     editor = GameEditor(root)
+    
+    # Report cold-start time once the first window has been drawn;
+    # --measure-startup prints it and exits, for scripted measurements
+    measure_only = '--measure-startup' in sys.argv[1:]
+    
+    def report_startup():
+        editor.startup_seconds = time.perf_counter() - _STARTED
+        print(f"Editor ready in {editor.startup_seconds * 1000:.1f} ms", file=sys.stderr)
+        if measure_only:
+            print(f"{editor.startup_seconds:.6f}")
+            root.destroy()
+    
+    root.update_idletasks()
+    root.after_idle(report_startup)
     root.mainloop()
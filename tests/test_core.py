@@ -0,0 +1,188 @@
+"""Tests for the editor's Tk-free building blocks"""
+import random
+import struct
+
+import pytest
+
+import grok_deepseek_claude_chatgpto1pro as editor
+
+
+def make_assets(tmp_path, count):
+    """An AssetStore whose images exist only as embedded bytes"""
+    assets = editor.AssetStore()
+    blobs = [f"image {i} ".encode('ascii') * (i + 1) for i in range(count)]
+    ids = [assets.acquire(str(tmp_path / 'gone' / f"img{i}.png"), reader=lambda b=blob: b)
+           for i, blob in enumerate(blobs)]
+    return assets, ids, blobs
+
+
+def open_scene(path):
+    scene = editor.SceneFile(str(path))
+    # Copy everything out so the mapping can be closed straight away
+    try:
+        objects = [(scene.x[i], scene.y[i], scene.width[i], scene.height[i],
+                    scene.asset[i], scene.flags[i], scene.names[i]) for i in range(scene.count)]
+        blobs = [bytes(scene.reader(i)()) for i in range(len(scene.assets))]
+        return objects, [path for path, _, _ in scene.assets], blobs, scene.tilemap
+    finally:
+        scene.close()
+
+
+def test_scene_round_trip(tmp_path):
+    assets, ids, blobs = make_assets(tmp_path, 3)
+    objects = [
+        editor.SceneObject(-5, 7, 30, 40, ids[1], assets.path(ids[1]), "hero"),
+        editor.SceneObject(100, 200, 1, 2, ids[0], assets.path(ids[0]), "ünïcode", dynamic=True),
+        editor.SceneObject(0, 0, 64, 64, ids[1], assets.path(ids[1]), ""),
+    ]
+    tilemap = editor.TileMap(ids[2], assets.path(ids[2]), 16, 5, 3, chunk_size=4)
+    tilemap.set(0, 0, 7)
+    tilemap.set(4, 2, editor.TileMap.MAX_INDEX)
+    path = tmp_path / 'level.gscene'
+    editor.SceneFile.save(str(path), objects, assets, tilemap)
+
+    loaded, paths, loaded_blobs, layer = open_scene(path)
+    assert loaded == [(-5, 7, 30, 40, 0, 0, "hero"),
+                      (100, 200, 1, 2, 1, editor.SceneFile.FLAG_DYNAMIC, "ünïcode"),
+                      (0, 0, 64, 64, 0, 0, "")]
+    # Assets are numbered in order of first use
+    assert paths == [assets.path(ids[1]), assets.path(ids[0]), assets.path(ids[2])]
+    assert loaded_blobs == [blobs[1], blobs[0], blobs[2]]
+    assert (layer['columns'], layer['rows'], layer['tile_size'], layer['chunk_size'],
+            layer['tileset']) == (5, 3, 16, 4, 2)
+    assert layer['tiles'] == tilemap.tiles
+
+
+def test_empty_scene_round_trip(tmp_path):
+    path = tmp_path / 'empty.gscene'
+    editor.SceneFile.save(str(path), [], editor.AssetStore())
+    assert open_scene(path) == ([], [], [], None)
+
+
+def test_version_1_scene(tmp_path):
+    """Scenes written before tile layers existed still open"""
+    blob = b'\x89PNG not really'
+    asset_path = b'/images/a.png'
+    names = "a\0b".encode('utf-8')
+    header = struct.pack('<4sHxxII', b'GSCN', 1, 2, 1)
+    offset = len(header) + 18 + len(asset_path) + 2 * (5 * 4 + 1) + 4 + len(names)
+    data = (header + struct.pack('<QQH', offset, len(blob), len(asset_path)) + asset_path
+            + struct.pack('<2i', 1, 2) + struct.pack('<2i', 3, 4)
+            + struct.pack('<2i', 5, 6) + struct.pack('<2i', 7, 8)
+            + struct.pack('<2I', 0, 0) + bytes([1, 0])
+            + struct.pack('<I', len(names)) + names + blob)
+    path = tmp_path / 'old.gscene'
+    path.write_bytes(data)
+
+    objects, paths, blobs, layer = open_scene(path)
+    assert objects == [(1, 3, 5, 7, 0, 1, "a"), (2, 4, 6, 8, 0, 0, "b")]
+    assert paths == ['/images/a.png']
+    assert blobs == [blob]
+    assert layer is None
+
+
+def test_scene_rejects_other_files(tmp_path):
+    path = tmp_path / 'not.gscene'
+    path.write_bytes(b'PNG!' + bytes(32))
+    with pytest.raises(ValueError):
+        editor.SceneFile(str(path))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_pack_atlas_has_no_overlaps(seed):
+    rng = random.Random(seed)
+    sizes = [(rng.randint(1, 300), rng.randint(1, 300)) for _ in range(200)]
+    sizes.append((3000, 10))  # larger than a page
+    placements, pages = editor.pack_atlas(sizes, max_size=1024)
+
+    assert len(placements) == len(sizes)
+    rects = {}
+    for (w, h), (page, x, y) in zip(sizes, placements):
+        page_w, page_h = pages[page]
+        assert 0 <= x and 0 <= y and x + w <= page_w and y + h <= page_h
+        rects.setdefault(page, []).append((x, y, w, h))
+    for page_rects in rects.values():
+        for i, (x, y, w, h) in enumerate(page_rects):
+            for ox, oy, ow, oh in page_rects[i + 1:]:
+                assert x + w <= ox or ox + ow <= x or y + h <= oy or oy + oh <= y
+
+
+def scatter(count, seed=0):
+    rng = random.Random(seed)
+    objects = []
+    for i in range(count):
+        # A few objects are big enough to go on the grid's side list
+        size = rng.choice((4, 16, 50, 130, 2000))
+        objects.append(editor.SceneObject(rng.randrange(-200, 1000), rng.randrange(-200, 1000),
+                                          size, rng.randint(1, size), 0, 'x.png', str(i)))
+    return objects
+
+
+def test_spatial_grid_matches_brute_force():
+    objects = scatter(300)
+    grid = editor.SpatialGrid(cell_size=32, max_cells=64)
+    for obj in objects:
+        grid.insert(obj)
+    # Moving objects keeps their place in the stacking order
+    rng = random.Random(1)
+    for obj in objects[::7]:
+        obj.x += rng.randrange(-300, 300)
+        grid.update(obj)
+    for obj in objects[::11]:
+        grid.remove(obj)
+    live = [obj for i, obj in enumerate(objects) if i % 11]
+
+    for _ in range(500):
+        x, y = rng.randrange(-300, 1100), rng.randrange(-300, 1100)
+        hits = [obj for obj in live if obj.contains(x, y)]
+        assert grid.pick(x, y) is (hits[-1] if hits else None)
+
+    for _ in range(100):
+        left, top = rng.randrange(-300, 1100), rng.randrange(-300, 1100)
+        right, bottom = left + rng.randint(1, 400), top + rng.randint(1, 400)
+        expected = [obj for obj in live
+                    if obj.x < right and obj.x + obj.width > left
+                    and obj.y < bottom and obj.y + obj.height > top]
+        assert grid.query(left, top, right, bottom) == expected[::-1]
+
+
+def test_tilemap_chunks():
+    tilemap = editor.TileMap(0, 'tiles.png', 10, 25, 12, chunk_size=8)
+    assert tilemap.chunk_bounds((3, 1)) == (240, 80, 250, 120)
+    assert tilemap.chunks_in(0, 0, 250, 120) == [(cx, cy) for cy in range(2) for cx in range(4)]
+    assert tilemap.chunks_in(75, 75, 85, 85) == [(0, 0), (1, 0), (0, 1), (1, 1)]
+
+    assert tilemap.set(24, 11, 3)
+    assert not tilemap.set(24, 11, 3)
+    assert not tilemap.set(25, 0, 3)
+    assert tilemap.get(24, 11) == 3
+    assert tilemap.changed == {(3, 1)}
+
+
+def test_arrange_boxes():
+    boxes = [(0, 0, 10, 10), (50, 20, 20, 10), (13, 40, 6, 5)]
+    assert editor.bounding_box(boxes) == (0, 0, 70, 45)
+    assert editor.align_boxes(boxes, 'right') == [(60, 0, 10, 10), (50, 20, 20, 10), (64, 40, 6, 5)]
+    assert editor.distribute_boxes(boxes, 'x') == [(0, 0, 10, 10), (50, 20, 20, 10), (27, 40, 6, 5)]
+    assert editor.snap_boxes(boxes, 8) == [(0, 0, 10, 10), (48, 24, 20, 10), (16, 40, 6, 5)]
+    assert editor.scale_boxes([(0, 0, 10, 10), (30, 0, 10, 10)], 2) == [(-20, -5, 20, 20), (40, -5, 20, 20)]
+    assert editor.index_runs([1, 2, 3, 7, 9, 10]) == [[1, 3], [7, 7], [9, 10]]
+
+
+def test_export_cache_keeps_files_other_scripts_use(tmp_path):
+    def export(script, *names):
+        cache = editor.ExportCache(str(tmp_path))
+        for name in names:
+            (tmp_path / name).write_bytes(b'x')
+        (tmp_path / script).write_text('')
+        cache.finish(str(tmp_path / script), names)
+
+    export('game1.py', 'hero.png', 'shared.png')
+    export('game2.py', 'enemy.png', 'shared.png')
+    export('game1.py', 'hero.png')
+    assert (tmp_path / 'shared.png').exists()
+
+    (tmp_path / 'game2.py').unlink()
+    export('game1.py', 'hero.png')
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        editor.ExportCache.FILENAME, 'game1.py', 'hero.png']